@@ -0,0 +1,185 @@
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from .schema import Word, Line, Paragraph
+
+
+class WordTable:
+    """Columnar store of OCR words with vectorized line/paragraph grouping.
+
+    Words are kept in reading order as parallel NumPy columns. Lines are
+    contiguous word ranges and paragraphs contiguous line ranges, so both are
+    described by start offsets, and their bounding boxes are computed once
+    with `reduceat` instead of per object.
+    """
+
+    def __init__(
+        self,
+        texts: Sequence[str],
+        x: Sequence[int],
+        y: Sequence[int],
+        width: Sequence[int],
+        height: Sequence[int],
+        block_num: Optional[Sequence[int]] = None,
+        par_num: Optional[Sequence[int]] = None,
+        line_num: Optional[Sequence[int]] = None,
+    ):
+        self.texts: List[str] = list(texts)
+        self.x = np.asarray(x, dtype=np.int32)
+        self.y = np.asarray(y, dtype=np.int32)
+        self.width = np.asarray(width, dtype=np.int32)
+        self.height = np.asarray(height, dtype=np.int32)
+        # Tesseract's own layout ids, zeros when the source does not provide them
+        zeros = np.zeros(len(self.texts), dtype=np.int32)
+        self.block_num = zeros if block_num is None else np.asarray(block_num, dtype=np.int32)
+        self.par_num = zeros if par_num is None else np.asarray(par_num, dtype=np.int32)
+        self.line_num = zeros if line_num is None else np.asarray(line_num, dtype=np.int32)
+
+        empty = np.zeros(0, dtype=np.int64)
+        self.line_starts = empty  # First word index of each line
+        self.paragraph_starts = empty  # First line index of each paragraph
+        self.line_boxes = np.zeros((0, 4), dtype=np.int32)  # x_min, y_min, x_max, y_max
+        self.paragraph_boxes = np.zeros((0, 4), dtype=np.int32)
+
+    @classmethod
+    def from_tesseract(cls, data) -> "WordTable":
+        """Build a table from `pytesseract.image_to_data(..., output_type=DICT)`."""
+        keep = [i for i, text in enumerate(data["text"]) if text.strip()]
+
+        def column(name):
+            return [data[name][i] for i in keep] if name in data else None
+
+        return cls(
+            [data["text"][i].strip() for i in keep],
+            column("left"),
+            column("top"),
+            column("width"),
+            column("height"),
+            column("block_num"),
+            column("par_num"),
+            column("line_num"),
+        )
+
+    def __len__(self):
+        return len(self.texts)
+
+    @property
+    def line_count(self) -> int:
+        return len(self.line_starts)
+
+    @property
+    def paragraph_count(self) -> int:
+        return len(self.paragraph_starts)
+
+    def group(self, line_threshold: int, paragraph_threshold: int):
+        """Split words into lines and lines into paragraphs by vertical jumps."""
+        if len(self) == 0:
+            self.set_lines(np.zeros(0, dtype=np.int64))
+            self.set_paragraphs(np.zeros(0, dtype=np.int64))
+            return
+
+        # A new line starts wherever the y jump from the previous word is too large
+        word_jumps = np.abs(np.diff(self.y))
+        self.set_lines(np.flatnonzero(word_jumps > line_threshold) + 1)
+
+        # Same idea for paragraphs, on the average y of each line
+        counts = np.diff(np.append(self.line_starts, len(self)))
+        avg_y = np.add.reduceat(self.y.astype(np.float64), self.line_starts) / counts
+        line_jumps = np.abs(np.diff(avg_y))
+        self.set_paragraphs(np.flatnonzero(line_jumps > paragraph_threshold) + 1)
+
+    def group_by_tesseract_ids(self):
+        """Group words using Tesseract's block/paragraph/line ids, no thresholds."""
+        if len(self) == 0:
+            self.set_lines(np.zeros(0, dtype=np.int64))
+            self.set_paragraphs(np.zeros(0, dtype=np.int64))
+            return
+
+        block_changed = np.diff(self.block_num) != 0
+        par_changed = block_changed | (np.diff(self.par_num) != 0)
+        line_changed = par_changed | (np.diff(self.line_num) != 0)
+        self.set_lines(np.flatnonzero(line_changed) + 1)
+
+        # A line opens a new paragraph when its first word changed block or paragraph
+        first_words = self.line_starts[1:]
+        self.set_paragraphs(np.flatnonzero(par_changed[first_words - 1]) + 1)
+
+    def set_lines(self, breaks: np.ndarray):
+        """Set line boundaries from the word indices where new lines begin."""
+        self.line_starts = np.concatenate(([0], breaks)).astype(np.int64) if len(self) else breaks
+        self.line_boxes = self._boxes(self.line_starts)
+
+    def set_paragraphs(self, breaks: np.ndarray):
+        """Set paragraph boundaries from the line indices where new paragraphs begin."""
+        self.paragraph_starts = (
+            np.concatenate(([0], breaks)).astype(np.int64) if self.line_count else breaks
+        )
+        if self.paragraph_count:
+            boxes = self.line_boxes
+            starts = self.paragraph_starts
+            self.paragraph_boxes = np.stack(
+                [
+                    np.minimum.reduceat(boxes[:, 0], starts),
+                    np.minimum.reduceat(boxes[:, 1], starts),
+                    np.maximum.reduceat(boxes[:, 2], starts),
+                    np.maximum.reduceat(boxes[:, 3], starts),
+                ],
+                axis=1,
+            )
+        else:
+            self.paragraph_boxes = np.zeros((0, 4), dtype=np.int32)
+
+    def _boxes(self, starts: np.ndarray) -> np.ndarray:
+        if len(starts) == 0:
+            return np.zeros((0, 4), dtype=np.int32)
+        return np.stack(
+            [
+                np.minimum.reduceat(self.x, starts),
+                np.minimum.reduceat(self.y, starts),
+                np.maximum.reduceat(self.x + self.width, starts),
+                np.maximum.reduceat(self.y + self.height, starts),
+            ],
+            axis=1,
+        )
+
+    def line_range(self, line: int):
+        stop = self.line_starts[line + 1] if line + 1 < self.line_count else len(self)
+        return int(self.line_starts[line]), int(stop)
+
+    def paragraph_range(self, paragraph: int):
+        """Range of line indices belonging to a paragraph."""
+        stop = (
+            self.paragraph_starts[paragraph + 1]
+            if paragraph + 1 < self.paragraph_count
+            else self.line_count
+        )
+        return int(self.paragraph_starts[paragraph]), int(stop)
+
+    def paragraph_word_range(self, paragraph: int):
+        """Range of word indices belonging to a paragraph."""
+        first_line, stop_line = self.paragraph_range(paragraph)
+        start = self.line_starts[first_line]
+        stop = self.line_starts[stop_line] if stop_line < self.line_count else len(self)
+        return int(start), int(stop)
+
+    def word(self, index: int) -> Word:
+        return Word(
+            self.texts[index],
+            int(self.x[index]),
+            int(self.y[index]),
+            int(self.width[index]),
+            int(self.height[index]),
+        )
+
+    def line_text(self, line: int) -> str:
+        start, stop = self.line_range(line)
+        return " ".join(self.texts[start:stop])
+
+    def paragraph_text(self, paragraph: int) -> str:
+        start, stop = self.paragraph_word_range(paragraph)
+        return " ".join(self.texts[start:stop])
+
+    def paragraphs(self) -> List[Paragraph]:
+        """Paragraph views over this table."""
+        return [Paragraph(self, index) for index in range(self.paragraph_count)]
@@ -0,0 +1,50 @@
+import importlib
+import threading
+from types import ModuleType
+from typing import Iterable
+
+
+# Define a function to lazily import a module
+def lazy_import(module_name):
+    def _import():
+        return importlib.import_module(module_name)
+
+    return _import
+
+
+class LazyModule(ModuleType):
+    """Stand-in for a module that is imported on first attribute access.
+
+    `cv2 = lazy_module("cv2")` at the top of a file keeps `cv2.imread(...)`
+    working unchanged, but OpenCV only loads when a function actually uses it.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+
+    def __getattr__(self, attribute):
+        value = getattr(importlib.import_module(self.__name__), attribute)
+        setattr(self, attribute, value)  # Later lookups skip __getattr__
+        return value
+
+    def __repr__(self):
+        return f"<lazy module '{self.__name__}'>"
+
+
+def lazy_module(name: str) -> LazyModule:
+    return LazyModule(name)
+
+
+def warm_imports(names: Iterable[str]) -> threading.Thread:
+    """Import modules on a daemon thread, so their first use does not wait."""
+
+    def _warm():
+        for name in names:
+            try:
+                importlib.import_module(name)
+            except ImportError as e:
+                print(f"Background import of {name} failed: {e}")
+
+    thread = threading.Thread(target=_warm, name="warm-imports", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,185 @@
+import importlib
+import shlex
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from setting import ocr_backend
+
+TESSERACT_COLUMNS = (
+    "level",
+    "page_num",
+    "block_num",
+    "par_num",
+    "line_num",
+    "word_num",
+    "left",
+    "top",
+    "width",
+    "height",
+    "conf",
+    "text",
+)
+
+
+class OCRBackend(ABC):
+    """Interface for OCR engines returning Tesseract's image_to_data table.
+
+    `image_to_data` takes an in-memory image and returns a dict of lists with
+    the same columns as `pytesseract.image_to_data(..., output_type=DICT)`.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def image_to_data(self, image: np.ndarray, languages: str, config: str) -> dict:
+        ...
+
+
+class PytesseractBackend(OCRBackend):
+    """Runs the tesseract executable once per call (fallback backend)."""
+
+    name = "pytesseract"
+
+    def __init__(self):
+        self._pytesseract = importlib.import_module("pytesseract")
+
+    def image_to_data(self, image, languages, config):
+        return self._pytesseract.image_to_data(
+            image,
+            lang=languages,
+            output_type=self._pytesseract.Output.DICT,
+            config=config,
+        )
+
+
+class TesserocrBackend(OCRBackend):
+    """Keeps Tesseract engines loaded in-process through tesserocr.
+
+    Engines are kept per (languages, config) in a process-wide free list: a
+    call takes an idle engine (or creates one when all are busy) and returns
+    it afterwards. The traineddata is loaded once per concurrent caller, not
+    per thread, so short-lived threads such as the GUI's detection jobs reuse
+    the engines of earlier ones. Pool worker processes each keep their own.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self):
+        self._tesserocr = importlib.import_module("tesserocr")
+        self._idle: Dict[Tuple[str, str], List[object]] = {}
+        self._lock = threading.Lock()
+
+    def _acquire(self, languages: str, config: str):
+        # An idle engine for these options, or a new one when all are in use
+        with self._lock:
+            idle = self._idle.get((languages, config))
+            if idle:
+                return idle.pop()
+        tesserocr = self._tesserocr
+        options = _parse_config(config)
+        api = tesserocr.PyTessBaseAPI(
+            lang=languages,
+            psm=options.get("psm", tesserocr.PSM.AUTO),
+            oem=options.get("oem", tesserocr.OEM.DEFAULT),
+        )
+        for name, value in options.get("variables", {}).items():
+            api.SetVariable(name, value)
+        return api
+
+    def _release(self, languages: str, config: str, api):
+        api.Clear()
+        with self._lock:
+            self._idle.setdefault((languages, config), []).append(api)
+
+    def image_to_data(self, image, languages, config):
+        api = self._acquire(languages, config)
+        try:
+            return self._recognize(api, image)
+        finally:
+            self._release(languages, config, api)
+
+    def _recognize(self, api, image) -> dict:
+        tesserocr = self._tesserocr
+        RIL = tesserocr.RIL
+        api.SetImage(Image.fromarray(np.ascontiguousarray(image)))
+        api.Recognize()
+
+        data = {column: [] for column in TESSERACT_COLUMNS}
+        block = paragraph = line = word = 0
+        iterator = api.GetIterator()
+        for result in tesserocr.iterate_level(iterator, RIL.WORD):
+            box = result.BoundingBox(RIL.WORD)
+            if box is None:
+                continue
+            # Rebuild Tesseract's block/paragraph/line/word numbering
+            if result.IsAtBeginningOf(RIL.BLOCK):
+                block, paragraph, line, word = block + 1, 0, 0, 0
+            if result.IsAtBeginningOf(RIL.PARA):
+                paragraph, line, word = paragraph + 1, 0, 0
+            if result.IsAtBeginningOf(RIL.TEXTLINE):
+                line, word = line + 1, 0
+            word += 1
+
+            x0, y0, x1, y1 = box
+            row = (5, 1, block, paragraph, line, word, x0, y0, x1 - x0, y1 - y0)
+            for column, value in zip(TESSERACT_COLUMNS, row):
+                data[column].append(value)
+            data["conf"].append(result.Confidence(RIL.WORD))
+            data["text"].append(result.GetUTF8Text(RIL.WORD) or "")
+        return data
+
+
+def _parse_config(config: str) -> dict:
+    """Translate tesseract command line options (--psm, --oem, -c) for tesserocr."""
+    options = {"variables": {}}
+    tokens = shlex.split(config or "")
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+        value = tokens[index + 1] if index + 1 < len(tokens) else None
+        if token in ("--psm", "--oem") and value is not None:
+            options[token[2:]] = int(value)
+            index += 1
+        elif token == "-c" and value is not None and "=" in value:
+            name, setting_value = value.split("=", 1)
+            options["variables"][name] = setting_value
+            index += 1
+        index += 1
+    return options
+
+
+BACKENDS = {
+    PytesseractBackend.name: PytesseractBackend,
+    TesserocrBackend.name: TesserocrBackend,
+}
+
+_backends: Dict[str, OCRBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def get_ocr_backend(name: Optional[str] = None) -> OCRBackend:
+    """Shared backend instance for this process.
+
+    "auto" picks tesserocr when it is installed and falls back to pytesseract,
+    as does an explicitly requested backend that cannot be imported.
+    """
+    name = name or ocr_backend
+    with _backends_lock:
+        if name not in _backends:
+            candidates = ["tesserocr", "pytesseract"] if name == "auto" else [name, "pytesseract"]
+            for candidate in candidates:
+                if candidate not in BACKENDS:
+                    raise ValueError(
+                        f"Unknown OCR backend '{candidate}', expected one of {list(BACKENDS)}"
+                    )
+                try:
+                    _backends[name] = BACKENDS[candidate]()
+                    break
+                except ImportError:
+                    if candidate == name:
+                        print(f"OCR backend '{name}' is not available, using pytesseract")
+        return _backends[name]
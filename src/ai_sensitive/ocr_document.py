@@ -1,14 +1,39 @@
-from typing import Optional, List
+from typing import Optional, Sequence
 
-import cv2
 import numpy as np
-import pytesseract
-import matplotlib.pyplot as plt
-from sklearn.cluster import KMeans
 
-from .schema import Word, Line, Paragraph
-
-from setting import ocr_config, debug_flag
+from .layout import WordTable
+from .lazy_modules import lazy_module
+from .ocr_backend import get_ocr_backend
+from .pipeline_report import count, stage
+from .preprocess import preprocess
+from .result_cache import content_hash, get_result_cache
+from .text_regions import detect_text_regions
+from .tiled_ocr import ocr_regions, tiled_image_to_data
+
+from setting import (
+    ocr_config,
+    debug_flag,
+    single_pass_ocr,
+    layout_strategy,
+    ocr_tile_size,
+    ocr_tile_overlap,
+    ocr_workers,
+    preprocess_steps,
+    ocr_target_dpi,
+    preprocess_max_skew,
+    binarize_block_size,
+    binarize_offset,
+    text_regions_enabled,
+    text_regions_max_coverage,
+)
+
+# OpenCV is only needed without a pre-decoded image and for plotting,
+# matplotlib only for plotting
+cv2 = lazy_module("cv2")
+plt = lazy_module("matplotlib.pyplot")
+
+LAYOUT_STRATEGIES = ("tesseract", "kmeans")
 
 
 class OCRDocument:
@@ -18,35 +43,140 @@ class OCRDocument:
         line_threshold: int = None,
         paragraph_threshold: int = None,
         languages: Optional[str] = "eng",
+        single_pass: Optional[bool] = None,
+        strategy: Optional[str] = None,
+        image: Optional[np.ndarray] = None,
+        gray_image: Optional[np.ndarray] = None,
+        tile_size: Optional[int] = None,
+        text_regions: Optional[bool] = None,
+        dpi: Optional[float] = None,
+        preprocessing: Optional[Sequence[str]] = None,
     ):
         self.image_path = image_path  # Path to the image
-        self.image = cv2.imread(image_path)  # Load the image using OpenCV
-        self.gray_image = cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY)
-        self.sensitive_block_image = self.image.copy()
+        # Load the image using OpenCV, unless already decoded BGR/gray pixels
+        # (e.g. views of a shared tools.image_buffer.ImageBuffer) are given
+        self.image = image if image is not None else cv2.imread(image_path)
+        self.gray_image = (
+            gray_image
+            if gray_image is not None
+            else cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY)
+        )
         self.paragraphs = []  # List to store paragraphs
+        self.layout: WordTable = None  # Columnar word table behind the paragraphs
         self.languages = languages  # Default language for OCR
-
-        # Perform OCR and automatically determine line and paragraph thresholds
-        if line_threshold == None or paragraph_threshold == None:
-            self.line_threshold, self.paragraph_threshold = (
-                self._auto_adjust_thresholds()
-            )
-
-        print(
-            f"Line Threshold: {self.line_threshold}, Paragraph Threshold: {self.paragraph_threshold}"
+        # Pages larger than this are OCR'd as overlapping tiles in parallel
+        self.tile_size = tile_size if tile_size is not None else ocr_tile_size
+        # Only OCR the parts of the page that look like text
+        self.text_regions = text_regions_enabled if text_regions is None else text_regions
+        # Resolution of the scan (if known) and the preprocessing run before
+        # OCR, word boxes are always reported in original image coordinates
+        self.dpi = dpi
+        self.preprocessing = tuple(
+            preprocessing if preprocessing is not None else preprocess_steps
         )
-        self._perform_ocr(self.line_threshold, self.paragraph_threshold)
+        self.single_pass = single_pass_ocr if single_pass is None else single_pass
+        self.strategy = strategy or layout_strategy
+        if self.strategy not in LAYOUT_STRATEGIES:
+            raise ValueError(
+                f"Unknown layout strategy '{self.strategy}', expected one of {LAYOUT_STRATEGIES}"
+            )
+        self.line_threshold = line_threshold
+        self.paragraph_threshold = paragraph_threshold
+
+        # In single-pass mode Tesseract runs once on the grayscale image and the
+        # word table is shared by threshold fitting and grouping
+        self.ocr_data = None
+        if self.single_pass or self.strategy == "tesseract":
+            self.ocr_data = self._run_tesseract(self.gray_image)
+
+        # The KMeans strategy determines line and paragraph thresholds automatically,
+        # the tesseract strategy uses the block/paragraph/line ids instead
+        if self.strategy == "kmeans":
+            if line_threshold == None or paragraph_threshold == None:
+                with stage("threshold_fitting"):
+                    self.line_threshold, self.paragraph_threshold = (
+                        self._auto_adjust_thresholds(self.ocr_data)
+                    )
+
+            print(
+                f"Line Threshold: {self.line_threshold}, Paragraph Threshold: {self.paragraph_threshold}"
+            )
+        self._perform_ocr(self.line_threshold, self.paragraph_threshold, self.ocr_data)
         if debug_flag:
             self.plot_three_graphs()
 
-    def _auto_adjust_thresholds(self):
+    def _run_tesseract(self, image, config: str = ocr_config):
+        """Run Tesseract once and return its word table as a dict of lists.
+
+        Results are cached on disk by image content, languages, config,
+        preprocessing and OCR backend.
+        """
+        backend = get_ocr_backend()
+        cache = get_result_cache()
+        if cache is not None:
+            preprocessing = (
+                self.preprocessing,
+                self.dpi,
+                ocr_target_dpi,
+                preprocess_max_skew,
+                binarize_block_size,
+                binarize_offset,
+            )
+            key = content_hash(
+                image,
+                self.languages,
+                config,
+                self.tile_size,
+                ocr_tile_overlap,
+                preprocessing,
+                (self.text_regions, text_regions_max_coverage),
+                backend.name,
+            )
+            data = cache.get("ocr", key)
+            if data is not None:
+                count("ocr_cache_hits", add=True)
+                return data
+
+        with stage("preprocess"):
+            prepared = preprocess(image, self.dpi, self.preprocessing)
+        image = prepared.image
+        height, width = image.shape[:2]
+        tiled = bool(self.tile_size) and max(width, height) > self.tile_size
+
+        regions = None
+        if self.text_regions:
+            with stage("text_regions"):
+                regions = detect_text_regions(image)
+            if regions is not None:
+                count("text_regions", len(regions))
+
+        with stage("ocr"):
+            if regions is not None:
+                # Regions do not overlap, words only need shifting to page space
+                data = ocr_regions(image, regions, self.languages, config, ocr_workers)
+            elif tiled:
+                data = tiled_image_to_data(
+                    image,
+                    self.languages,
+                    config,
+                    self.tile_size,
+                    ocr_tile_overlap,
+                    ocr_workers,
+                )
+            else:
+                data = backend.image_to_data(image, self.languages, config)
+        data = prepared.data_to_original(data)
+        if cache is not None:
+            cache.put("ocr", key, data)
+        return data
+
+    def _auto_adjust_thresholds(self, data=None):
         """Automatically determine optimal line and paragraph thresholds based on OCR data."""
-        data = pytesseract.image_to_data(
-            self.image,
-            lang=self.languages,
-            output_type=pytesseract.Output.DICT,
-            config=ocr_config,
-        )
+        # Only the KMeans strategy needs scikit-learn, so import it on demand
+        from sklearn.cluster import KMeans
+
+        if data is None:
+            data = self._run_tesseract(self.gray_image)
 
         # Calculate vertical distances between adjacent words
         word_y_coords = [
@@ -117,114 +247,54 @@ class OCRDocument:
         ]
         return line_distances
 
-    def _perform_ocr(self, line_threshold: int, paragraph_threshold: int):
-        # Perform OCR on the image
-        data = pytesseract.image_to_data(
-            self.gray_image, lang=self.languages, output_type=pytesseract.Output.DICT
-        )
-
-        # Group words into lines and lines into paragraphs
-        lines = self._group_words_into_lines(data, line_threshold)
-        self.paragraphs = self._group_lines_into_paragraphs(lines, paragraph_threshold)
-
-    def _group_words_into_lines(self, data, line_threshold: int) -> List[Line]:
-        """Groups words detected by OCR into lines based on their vertical position."""
-        lines = []
-        current_line = Line()
-        previous_y = None
-
-        for i in range(len(data["text"])):
-            text = data["text"][i].strip()
-            if text:  # Ensure the text is not empty
-                x, y, w, h = (
-                    data["left"][i],
-                    data["top"][i],
-                    data["width"][i],
-                    data["height"][i],
-                )
-                word = Word(text, x, y, w, h)
-
-                # Check if this word should start a new line based on the y-coordinate
-                if previous_y is not None and abs(y - previous_y) > line_threshold:
-                    # Start a new line if y-coordinate difference is too large
-                    lines.append(current_line)
-                    current_line = Line()
-
-                # Add the word to the current line
-                current_line.add_word(word)
-                previous_y = y
-
-        # Add the last line if not empty
-        if current_line.words:
-            lines.append(current_line)
-
-        return lines
-
-    def _group_lines_into_paragraphs(
-        self, lines: List[Line], paragraph_threshold: int
-    ) -> List[Paragraph]:
-        """Groups lines into paragraphs based on their vertical distance."""
-        paragraphs = []
-        current_paragraph = Paragraph()
-        previous_y = None
-
-        for line in lines:
-            # Calculate the average y position of words in the line
-            avg_y = sum(word.y for word in line.words) / len(line.words)
-
-            # Check if the line should start a new paragraph
-            if previous_y is not None and abs(avg_y - previous_y) > paragraph_threshold:
-                # Start a new paragraph if vertical distance is too large
-                paragraphs.append(current_paragraph)
-                current_paragraph = Paragraph()
-
-            # Add line to the current paragraph
-            current_paragraph.add_line(line)
-            previous_y = avg_y
-
-        # Add the last paragraph if not empty
-        if current_paragraph.lines:
-            paragraphs.append(current_paragraph)
-
-        return paragraphs
+    def _perform_ocr(self, line_threshold: int, paragraph_threshold: int, data=None):
+        # Perform OCR on the image unless a word table is already available
+        if data is None:
+            data = self._run_tesseract(self.gray_image, config="")
+            self.ocr_data = data
+
+        # Group words into lines and lines into paragraphs on the columnar table
+        with stage("grouping"):
+            self.layout = WordTable.from_tesseract(data)
+            if self.strategy == "tesseract":
+                self.layout.group_by_tesseract_ids()
+            else:
+                self.layout.group(line_threshold, paragraph_threshold)
+            self.paragraphs = self.layout.paragraphs()
+        count("words", len(self.layout))
+        count("paragraphs", len(self.paragraphs))
 
     def _plot_words(self, word_plot=True):
         """Plots the OCR results showing bounding boxes around each word."""
         image_rgb = self.image.copy()
 
-        # Loop over paragraphs, lines, and words to plot bounding boxes
-        for paragraph in self.paragraphs:
-            for line in paragraph.lines:
-                for word in line.words:
-                    x, y, w, h = word.x, word.y, word.width, word.height
-                    # Draw rectangle around each word
-                    cv2.rectangle(image_rgb, (x, y), (x + w, y + h), (0, 255, 0), 2)
-                    if word_plot:
-                        # Add the detected text to the image
-                        plt.text(
-                            x,
-                            y - 5,
-                            word.text,
-                            fontsize=12,
-                            color="blue",
-                            weight="bold",
-                        )
+        # Loop over the word columns to plot bounding boxes
+        layout = self.layout
+        for i in range(len(layout)):
+            x, y = int(layout.x[i]), int(layout.y[i])
+            w, h = int(layout.width[i]), int(layout.height[i])
+            # Draw rectangle around each word
+            cv2.rectangle(image_rgb, (x, y), (x + w, y + h), (0, 255, 0), 2)
+            if word_plot:
+                # Add the detected text to the image
+                plt.text(
+                    x,
+                    y - 5,
+                    layout.texts[i],
+                    fontsize=12,
+                    color="blue",
+                    weight="bold",
+                )
         return image_rgb
 
     def _plot_lines(self):
         """Plots the OCR results showing bounding boxes around each line."""
         image_rgb = self.image.copy()
 
-        for paragraph in self.paragraphs:
-            for line in paragraph.lines:
-                x_min = min(word.x for word in line.words)
-                y_min = min(word.y for word in line.words)
-                x_max = max(word.x + word.width for word in line.words)
-                y_max = max(word.y + word.height for word in line.words)
-
-                cv2.rectangle(
-                    image_rgb, (x_min, y_min), (x_max, y_max), (255, 0, 0), 2
-                )  # Blue box for lines
+        for x_min, y_min, x_max, y_max in self.layout.line_boxes.tolist():
+            cv2.rectangle(
+                image_rgb, (x_min, y_min), (x_max, y_max), (255, 0, 0), 2
+            )  # Blue box for lines
 
         return image_rgb
 
@@ -232,16 +302,7 @@ class OCRDocument:
         """Plots the OCR results showing bounding boxes around each paragraph."""
         image_rgb = self.image.copy()
 
-        for paragraph in self.paragraphs:
-            x_min = min(word.x for line in paragraph.lines for word in line.words)
-            y_min = min(word.y for line in paragraph.lines for word in line.words)
-            x_max = max(
-                word.x + word.width for line in paragraph.lines for word in line.words
-            )
-            y_max = max(
-                word.y + word.height for line in paragraph.lines for word in line.words
-            )
-
+        for x_min, y_min, x_max, y_max in self.layout.paragraph_boxes.tolist():
             cv2.rectangle(
                 image_rgb, (x_min, y_min), (x_max, y_max), (0, 0, 255), 2
             )  # Red box for paragraphs
@@ -274,6 +335,13 @@ class OCRDocument:
 
         plt.show()
 
+    def __getstate__(self):
+        # Pixel buffers are not shipped across process boundaries, only the
+        # OCR results are needed by the detector
+        state = self.__dict__.copy()
+        state["image"] = state["gray_image"] = None
+        return state
+
     def get_text(self):
         # Concatenate all paragraphs' texts to form the document's text
         return "\n\n".join(paragraph.get_text() for paragraph in self.paragraphs)
@@ -0,0 +1,121 @@
+import os
+import shutil
+import time
+
+from setting import onnx_dir, onnx_quantize, onnx_threads
+
+ONNX_MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model_quantized.onnx"
+# Only used to trace the graph, the exported model accepts any text and labels
+EXPORT_TEXT = "John Doe was born on 1 May 1990 and lives at 1 Main Street."
+EXPORT_LABELS = ["Full Name", "Date of Birth", "Address"]
+# Written by save_pretrained next to the graph, loading needs all of them
+CONFIG_FILES = ("gliner_config.json", "tokenizer_config.json")
+
+
+def onnx_model_file(quantize: bool = onnx_quantize) -> str:
+    return QUANTIZED_MODEL_FILE if quantize else ONNX_MODEL_FILE
+
+
+def onnx_model_dir(name: str) -> str:
+    # One directory per model, holding config, tokenizer and ONNX files
+    return os.path.join(onnx_dir, name.replace("/", "--"))
+
+
+def export_onnx_model(name: str, quantize: bool = onnx_quantize) -> str:
+    """Export a GLiNER model to ONNX once and return its directory.
+
+    The fp32 graph is kept next to the quantized one, so switching
+    `onnx_quantize` later only runs the quantization step.
+    """
+    directory = onnx_model_dir(name)
+    model_file = onnx_model_file(quantize)
+    configured = all(
+        os.path.exists(os.path.join(directory, file)) for file in CONFIG_FILES
+    )
+    if configured and os.path.exists(os.path.join(directory, model_file)):
+        return directory
+
+    if not configured or not os.path.exists(os.path.join(directory, ONNX_MODEL_FILE)):
+        _export(name, directory)
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        print(f"Quantizing {name} to int8...")
+        tmp_path = os.path.join(directory, QUANTIZED_MODEL_FILE + ".tmp")
+        quantize_dynamic(
+            os.path.join(directory, ONNX_MODEL_FILE),
+            tmp_path,
+            weight_type=QuantType.QUInt8,
+        )
+        os.replace(tmp_path, os.path.join(directory, QUANTIZED_MODEL_FILE))
+    return directory
+
+
+def _export(name: str, directory: str):
+    import torch
+    from gliner import GLiNER
+
+    start = time.perf_counter()
+    print(f"Exporting {name} to ONNX...")
+    model = GLiNER.from_pretrained(name)
+    model.eval()
+
+    # Written to a temporary directory first so an interrupted export is
+    # never mistaken for a finished one
+    tmp_dir = directory + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    model.save_pretrained(tmp_dir)
+    model.data_processor.transformer_tokenizer.save_pretrained(tmp_dir)
+
+    inputs, _ = model.prepare_model_inputs([EXPORT_TEXT], EXPORT_LABELS)
+    input_names = ["input_ids", "attention_mask", "words_mask", "text_lengths"]
+    dynamic_axes = {
+        "input_ids": {0: "batch_size", 1: "sequence_length"},
+        "attention_mask": {0: "batch_size", 1: "sequence_length"},
+        "words_mask": {0: "batch_size", 1: "sequence_length"},
+        "text_lengths": {0: "batch_size", 1: "value"},
+        "logits": {0: "position", 1: "batch_size", 2: "sequence_length", 3: "num_classes"},
+    }
+    if model.config.span_mode != "token_level":
+        input_names += ["span_idx", "span_mask"]
+        dynamic_axes["span_idx"] = {0: "batch_size", 1: "num_spans", 2: "idx"}
+        dynamic_axes["span_mask"] = {0: "batch_size", 1: "num_spans"}
+
+    with torch.no_grad():
+        torch.onnx.export(
+            model.model,
+            tuple(inputs[key] for key in input_names),
+            f=os.path.join(tmp_dir, ONNX_MODEL_FILE),
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+        )
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(os.path.dirname(directory), exist_ok=True)
+    os.replace(tmp_dir, directory)
+    print(f"Exported {name} in {time.perf_counter() - start:.2f}s")
+
+
+def load_onnx_model(name: str, quantize: bool = onnx_quantize, threads=onnx_threads):
+    """Load the cached ONNX export of a GLiNER model (exporting it if needed)."""
+    import onnxruntime
+    from gliner import GLiNER
+
+    directory = export_onnx_model(name, quantize)
+    session_options = onnxruntime.SessionOptions()
+    session_options.graph_optimization_level = (
+        onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    )
+    if threads:
+        session_options.intra_op_num_threads = threads
+    return GLiNER.from_pretrained(
+        directory,
+        load_onnx_model=True,
+        load_tokenizer=True,
+        onnx_model_file=onnx_model_file(quantize),
+        session_options=session_options,
+    )
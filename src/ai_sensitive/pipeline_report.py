@@ -0,0 +1,199 @@
+import contextlib
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Report of the document being processed in the current thread/context, the
+# module-level `stage` and `count` helpers record into it (or do nothing)
+_current_report: contextvars.ContextVar = contextvars.ContextVar(
+    "pipeline_report", default=None
+)
+
+
+def resident_memory() -> int:
+    """Current resident set size of this process in bytes (0 if unknown)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    return peak_memory()
+
+
+def peak_memory() -> int:
+    """Peak resident set size of this process in bytes (0 if unknown)."""
+    try:
+        import resource
+    except ImportError:
+        return 0
+    # ru_maxrss is reported in bytes on macOS and KiB on Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class PipelineReport:
+    """Stage timings, counts and memory figures for one document."""
+
+    def __init__(self, document: str):
+        self.document = document
+        self.started = time.time()  # Wall clock, for the exported records
+        self._origin = time.perf_counter()
+        self.stages: List[dict] = []  # name, start and duration in seconds, thread
+        self.counts: Dict[str, int] = {}
+        self.peak_rss_bytes = resident_memory()
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def activate(self):
+        """Make this the report the module-level helpers record into."""
+        token = _current_report.set(self)
+        try:
+            yield self
+        finally:
+            _current_report.reset(token)
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            rss = resident_memory()
+            with self._lock:
+                self.stages.append(
+                    {
+                        "name": name,
+                        "start": start - self._origin,
+                        "duration": end - start,
+                        "thread": threading.get_ident(),
+                    }
+                )
+                self.peak_rss_bytes = max(self.peak_rss_bytes, rss)
+
+    def __getstate__(self):
+        # Reports travel back from pool processes, the lock does not pickle
+        state = dict(self.__dict__)
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def include_stages(self, other: "PipelineReport"):
+        """Copy the stages of another report, e.g. work shared by documents.
+
+        Start times are shifted to this report's origin, perf_counter is a
+        system-wide clock so this also holds for reports from other processes.
+        """
+        shift = other._origin - self._origin
+        with self._lock:
+            for stage in other.stages:
+                self.stages.append(dict(stage, start=stage["start"] + shift))
+            self.peak_rss_bytes = max(self.peak_rss_bytes, other.peak_rss_bytes)
+
+    def count(self, name: str, value: int = 1, add: bool = False):
+        with self._lock:
+            if add:
+                value += self.counts.get(name, 0)
+            self.counts[name] = value
+
+    def totals(self) -> Dict[str, float]:
+        """Seconds per stage name, summed over repeated stages."""
+        totals: Dict[str, float] = {}
+        for stage in self.stages:
+            totals[stage["name"]] = totals.get(stage["name"], 0.0) + stage["duration"]
+        return totals
+
+    def to_dict(self) -> dict:
+        return {
+            "document": self.document,
+            "started": self.started,
+            "stage_seconds": self.totals(),
+            "stages": self.stages,
+            "counts": self.counts,
+            "peak_rss_bytes": self.peak_rss_bytes,
+            "process_peak_rss_bytes": peak_memory(),
+        }
+
+    def summary(self) -> str:
+        lines = [f"Pipeline report for {self.document}"]
+        for name, seconds in sorted(self.totals().items(), key=lambda item: -item[1]):
+            lines.append(f"  {name:<16} {seconds * 1000:10.1f} ms")
+        for name, value in self.counts.items():
+            lines.append(f"  {name:<16} {value:10d}")
+        lines.append(f"  {'peak rss':<16} {self.peak_rss_bytes / 2**20:10.1f} MiB")
+        return "\n".join(lines)
+
+    def write_jsonl(self, path: str):
+        """Append this report as one JSON line."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "a") as f:
+            f.write(json.dumps(self.to_dict()) + "\n")
+
+    def write_chrome_trace(self, path: str):
+        """Write the stages as a trace for chrome://tracing or Perfetto.
+
+        A "{document}" placeholder in `path` is replaced by the document's
+        file name, otherwise the file is overwritten by every report.
+        """
+        name = os.path.splitext(os.path.basename(self.document))[0]
+        path = path.replace("{document}", name)
+        pid = os.getpid()
+        events = [
+            {
+                "name": stage["name"],
+                "cat": "pipeline",
+                "ph": "X",  # Complete event with a duration
+                "ts": stage["start"] * 1e6,
+                "dur": stage["duration"] * 1e6,
+                "pid": pid,
+                "tid": stage["thread"],
+            }
+            for stage in self.stages
+        ]
+        events.append(
+            {
+                "name": "counts",
+                "ph": "C",
+                "ts": 0,
+                "pid": pid,
+                "args": dict(self.counts),
+            }
+        )
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(
+                {"traceEvents": events, "otherData": {"document": self.document}}, f
+            )
+
+
+def current_report() -> Optional[PipelineReport]:
+    return _current_report.get()
+
+
+@contextlib.contextmanager
+def stage(name: str):
+    """Time a block into the current report, if there is one."""
+    report = _current_report.get()
+    if report is None:
+        yield
+        return
+    with report.stage(name):
+        yield
+
+
+def count(name: str, value: int = 1, add: bool = False):
+    """Set (or with `add`, increase) a count on the current report."""
+    report = _current_report.get()
+    if report is not None:
+        report.count(name, value, add)
@@ -0,0 +1,204 @@
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .lazy_modules import lazy_module
+
+from setting import (
+    preprocess_steps,
+    ocr_target_dpi,
+    preprocess_max_skew,
+    binarize_block_size,
+    binarize_offset,
+)
+
+cv2 = lazy_module("cv2")
+
+PREPROCESS_STEPS = ("downscale", "deskew", "crop", "binarize")
+SKEW_ANALYSIS_SIZE = 1000  # Long side of the thumbnail the skew is measured on
+CROP_PADDING = 10  # Pixels of blank margin kept around the content
+
+
+class PreparedImage:
+    """A grayscale image prepared for OCR and the way back to the original.
+
+    `matrix` is the 3 x 3 affine transform from original to prepared pixel
+    coordinates, every OCR box is mapped back through its inverse.
+    """
+
+    def __init__(self, image: np.ndarray, original_size):
+        self.image = image
+        self.original_size = original_size  # (width, height)
+        self.matrix = np.eye(3)
+        self.steps: List[str] = []
+
+    def apply(self, image: np.ndarray, matrix: np.ndarray, step: str):
+        self.image = image
+        self.matrix = matrix @ self.matrix
+        self.steps.append(step)
+
+    def boxes_to_original(self, boxes: np.ndarray) -> np.ndarray:
+        """Map N x 4 (x, y, width, height) boxes to original image space.
+
+        Rotated boxes are replaced by the axis-aligned box around their
+        corners, so a redaction never covers less than the word.
+        """
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        if not self.steps or len(boxes) == 0:
+            return boxes.astype(np.int64)
+
+        x0, y0 = boxes[:, 0], boxes[:, 1]
+        x1, y1 = x0 + boxes[:, 2], y0 + boxes[:, 3]
+        corners = np.stack(
+            [
+                np.stack([x0, y0], axis=1),
+                np.stack([x1, y0], axis=1),
+                np.stack([x0, y1], axis=1),
+                np.stack([x1, y1], axis=1),
+            ],
+            axis=1,
+        )  # N x 4 x 2
+        inverse = np.linalg.inv(self.matrix)
+        mapped = corners @ inverse[:2, :2].T + inverse[:2, 2]
+
+        width, height = self.original_size
+        left = np.clip(np.floor(mapped[:, :, 0].min(axis=1)), 0, width)
+        top = np.clip(np.floor(mapped[:, :, 1].min(axis=1)), 0, height)
+        right = np.clip(np.ceil(mapped[:, :, 0].max(axis=1)), 0, width)
+        bottom = np.clip(np.ceil(mapped[:, :, 1].max(axis=1)), 0, height)
+        return np.stack([left, top, right - left, bottom - top], axis=1).astype(np.int64)
+
+    def data_to_original(self, data: Dict[str, list]) -> Dict[str, list]:
+        """Return a copy of a Tesseract word table in original coordinates."""
+        if not self.steps:
+            return data
+        boxes = np.stack(
+            [data["left"], data["top"], data["width"], data["height"]], axis=1
+        )
+        mapped = self.boxes_to_original(boxes)
+        data = dict(data)
+        for column, name in enumerate(("left", "top", "width", "height")):
+            data[name] = mapped[:, column].tolist()
+        return data
+
+
+def _ink_mask(gray: np.ndarray) -> np.ndarray:
+    # Dark pixels on a light page, Otsu picks the split
+    _, mask = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    return mask
+
+
+def downscale(prepared: PreparedImage, dpi: Optional[float], target_dpi: int = ocr_target_dpi):
+    """Scale scans above the target resolution down to it."""
+    if not dpi or dpi <= target_dpi * 1.1:
+        return
+    factor = target_dpi / dpi
+    height, width = prepared.image.shape[:2]
+    size = (max(int(round(width * factor)), 1), max(int(round(height * factor)), 1))
+    image = cv2.resize(prepared.image, size, interpolation=cv2.INTER_AREA)
+    matrix = np.diag([size[0] / width, size[1] / height, 1.0])
+    prepared.apply(image, matrix, "downscale")
+
+
+def estimate_skew(gray: np.ndarray, max_angle: float = preprocess_max_skew) -> float:
+    """Angle in degrees that makes the text lines horizontal.
+
+    Rotations of a thumbnail are scored by how sharply the row sums of the
+    ink change (text lines and gaps line up only when level), first in half
+    degree steps, then in tenths around the best one.
+    """
+    height, width = gray.shape[:2]
+    factor = min(SKEW_ANALYSIS_SIZE / max(width, height), 1.0)
+    small = cv2.resize(gray, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA)
+    ink = _ink_mask(small)
+    center = (small.shape[1] / 2, small.shape[0] / 2)
+
+    def score(angle: float) -> float:
+        rotation = cv2.getRotationMatrix2D(center, angle, 1.0)
+        rotated = cv2.warpAffine(ink, rotation, (small.shape[1], small.shape[0]))
+        rows = rotated.sum(axis=1, dtype=np.float64)
+        return float(np.sum(np.diff(rows) ** 2))
+
+    coarse = np.arange(-max_angle, max_angle + 1e-9, 0.5)
+    best = max(coarse, key=score)
+    fine = np.arange(best - 0.5, best + 0.5 + 1e-9, 0.1)
+    return float(max(fine, key=score))
+
+
+def deskew(prepared: PreparedImage, max_angle: float = preprocess_max_skew):
+    """Rotate the page level, on a canvas large enough to keep every pixel."""
+    angle = estimate_skew(prepared.image, max_angle)
+    if abs(angle) < 0.1:
+        return
+    height, width = prepared.image.shape[:2]
+    rotation = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    cos, sin = abs(rotation[0, 0]), abs(rotation[0, 1])
+    new_width = int(np.ceil(width * cos + height * sin))
+    new_height = int(np.ceil(width * sin + height * cos))
+    rotation[0, 2] += (new_width - width) / 2
+    rotation[1, 2] += (new_height - height) / 2
+    image = cv2.warpAffine(
+        prepared.image,
+        rotation,
+        (new_width, new_height),
+        flags=cv2.INTER_LINEAR,
+        borderValue=255,
+    )
+    prepared.apply(image, np.vstack([rotation, [0, 0, 1]]), "deskew")
+
+
+def crop_margins(prepared: PreparedImage, padding: int = CROP_PADDING):
+    """Cut blank margins, keeping `padding` pixels around the content."""
+    ink = _ink_mask(prepared.image)
+    # Rows/columns with a couple of dark pixels count, single specks do not
+    rows = np.flatnonzero(np.count_nonzero(ink, axis=1) > 2)
+    cols = np.flatnonzero(np.count_nonzero(ink, axis=0) > 2)
+    if len(rows) == 0 or len(cols) == 0:
+        return
+    height, width = prepared.image.shape[:2]
+    top, bottom = max(rows[0] - padding, 0), min(rows[-1] + padding + 1, height)
+    left, right = max(cols[0] - padding, 0), min(cols[-1] + padding + 1, width)
+    if (top, left, bottom, right) == (0, 0, height, width):
+        return
+    matrix = np.array([[1.0, 0, -left], [0, 1.0, -top], [0, 0, 1.0]])
+    prepared.apply(prepared.image[top:bottom, left:right], matrix, "crop")
+
+
+def binarize(
+    prepared: PreparedImage,
+    block_size: int = binarize_block_size,
+    offset: int = binarize_offset,
+):
+    """Adaptive threshold, evens out shading and faint backgrounds."""
+    image = cv2.adaptiveThreshold(
+        prepared.image,
+        255,
+        cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+        cv2.THRESH_BINARY,
+        block_size | 1,  # Must be odd
+        offset,
+    )
+    prepared.apply(image, np.eye(3), "binarize")
+
+
+def preprocess(
+    gray: np.ndarray,
+    dpi: Optional[float] = None,
+    steps: Sequence[str] = preprocess_steps,
+) -> PreparedImage:
+    """Run the configured steps, always in pipeline order."""
+    unknown = set(steps) - set(PREPROCESS_STEPS)
+    if unknown:
+        raise ValueError(
+            f"Unknown preprocessing steps {sorted(unknown)}, expected any of {PREPROCESS_STEPS}"
+        )
+    prepared = PreparedImage(gray, (gray.shape[1], gray.shape[0]))
+    if "downscale" in steps:
+        downscale(prepared, dpi)
+    if "deskew" in steps:
+        deskew(prepared)
+    if "crop" in steps:
+        crop_margins(prepared)
+    if "binarize" in steps:
+        binarize(prepared)
+    return prepared
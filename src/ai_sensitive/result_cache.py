@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+
+from setting import cache_enabled, cache_dir, cache_max_bytes
+
+NAMESPACES = ("ocr", "ner")
+
+
+def content_hash(*parts) -> str:
+    """SHA-256 over image arrays, strings and other JSON-serialisable values."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            digest.update(str((part.shape, part.dtype.str)).encode())
+            digest.update(np.ascontiguousarray(part).data)
+        else:
+            digest.update(json.dumps(part, sort_keys=True).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Size-bounded on-disk cache for OCR word tables and NER entities.
+
+    Entries are JSON files grouped by namespace ("ocr", "ner"). Reading an
+    entry refreshes its modification time, and the least recently used
+    entries are evicted once the cache grows past `max_bytes`.
+    """
+
+    def __init__(self, directory: str = cache_dir, max_bytes: int = cache_max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None  # Computed on first write
+
+    def _path(self, namespace: str, key: str) -> str:
+        return os.path.join(self.directory, namespace, key[:2], key + ".json")
+
+    def get(self, namespace: str, key: str):
+        path = self._path(namespace, key)
+        try:
+            with open(path) as f:
+                value = json.load(f)
+            os.utime(path)  # Mark as recently used
+        except (OSError, ValueError):
+            self.misses[namespace] = self.misses.get(namespace, 0) + 1
+            return None
+        self.hits[namespace] = self.hits.get(namespace, 0) + 1
+        return value
+
+    def put(self, namespace: str, key: str, value):
+        path = self._path(namespace, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = json.dumps(value).encode()
+
+        # Write atomically, other processes may share the cache directory
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            else:
+                self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        """(path, size, mtime) of every cached entry."""
+        # Only the namespace directories, anything else under `directory`
+        # is not ours to count or delete
+        for namespace in NAMESPACES:
+            for dirpath, _, names in os.walk(os.path.join(self.directory, namespace)):
+                for name in names:
+                    if name.endswith(".json"):
+                        path = os.path.join(dirpath, name)
+                        try:
+                            stat = os.stat(path)
+                        except OSError:
+                            continue
+                        yield path, stat.st_size, stat.st_mtime
+
+    def _evict(self):
+        # Drop the least recently used entries until we are below 90% of the limit
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        self._size = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for path, size, _ in entries:
+            if self._size <= target:
+                break
+            try:
+                os.remove(path)
+                self._size -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            for path, _, _ in list(self._entries()):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._size = 0
+
+    def stats(self) -> dict:
+        return {
+            "hits": dict(self.hits),
+            "misses": dict(self.misses),
+            "size_bytes": self._size,
+            "max_bytes": self.max_bytes,
+        }
+
+
+_result_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """The process-wide cache, or None when caching is disabled in settings."""
+    global _result_cache
+    if not cache_enabled:
+        return None
+    if _result_cache is None:
+        _result_cache = ResultCache()
+    return _result_cache
@@ -0,0 +1,148 @@
+import ipaddress
+import re
+import string
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Labels whose formats the rules below recognise completely, so the NER model
+# does not need to look for them. The others are only partly covered and stay
+# in NER: SSNs written without separators, card numbers misread by OCR (which
+# fail the Luhn check), free-form phone numbers and dates without a keyword.
+RULE_COVERED_LABELS = (
+    "Email Address",
+    "IP Address",
+)
+
+EMAIL_PATTERN = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}\b")
+IPV4_PATTERN = re.compile(r"(?<![\d.])(?:\d{1,3}\.){3}\d{1,3}(?![\d.])")
+IPV6_PATTERN = re.compile(r"(?<![\w:])(?:[0-9A-Fa-f]{0,4}:){2,7}[0-9A-Fa-f]{0,4}(?![\w:])")
+CREDIT_CARD_PATTERN = re.compile(r"(?<!\d)\d(?:[ -]?\d){12,18}(?!\d)")
+SSN_PATTERN = re.compile(r"(?<!\d)(\d{3})[- ](\d{2})[- ](\d{4})(?!\d)")
+# Not preceded or followed by another digit group, so pieces of longer
+# numbers (e.g. card numbers that fail the Luhn check) are not phone numbers
+PHONE_PATTERN = re.compile(
+    r"(?<![\w+])(?<!\d[\s.-])(?:\+\d{1,3}[\s.-]?)?(?:\(\d{2,4}\)|\d{2,4})[\s.-]?\d{3,4}[\s.-]?\d{3,4}(?![\s.-]?\d)"
+)
+
+_MONTHS = r"(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)[a-z]*\.?"
+DATE_PATTERN = re.compile(
+    r"(?<!\d)(?:"
+    r"\d{1,2}[/.-]\d{1,2}[/.-](?:\d{4}|\d{2})"  # 31/12/1990, 12-31-90
+    r"|\d{4}[/.-]\d{1,2}[/.-]\d{1,2}"  # 1990-12-31
+    rf"|\d{{1,2}}\s+{_MONTHS}\s*,?\s*\d{{4}}"  # 31 Dec 1990
+    rf"|{_MONTHS}\s+\d{{1,2}},?\s*\d{{4}}"  # December 31, 1990
+    r")(?!\d)",
+    re.IGNORECASE,
+)
+# Keywords shortly before a date decide which label it gets
+DATE_CONTEXT = (
+    ("Date of Birth", re.compile(r"\b(?:d\.?o\.?b|birth|born)\b", re.IGNORECASE)),
+    ("Issue Date", re.compile(r"\b(?:issued?|iss|date of issue)\b", re.IGNORECASE)),
+)
+DATE_CONTEXT_CHARS = 30
+
+
+def luhn_valid(digits: str) -> bool:
+    total = 0
+    for index, char in enumerate(reversed(digits)):
+        value = int(char)
+        if index % 2 == 1:
+            value *= 2
+            if value > 9:
+                value -= 9
+        total += value
+    return total % 10 == 0
+
+
+def _digits(text: str) -> str:
+    return "".join(char for char in text if char.isdigit())
+
+
+def _valid_ip(text: str) -> bool:
+    try:
+        ipaddress.ip_address(text)
+    except ValueError:
+        return False
+    return True
+
+
+def _valid_ipv6(text: str) -> bool:
+    # A bare "::" is a valid address but never PII, require a hex group
+    return any(char in string.hexdigits for char in text) and _valid_ip(text)
+
+
+def _valid_credit_card(text: str) -> bool:
+    digits = _digits(text)
+    return 13 <= len(digits) <= 19 and luhn_valid(digits)
+
+
+def _valid_ssn(match: re.Match) -> bool:
+    area, group, serial = match.groups()
+    return (
+        area not in ("000", "666")
+        and not area.startswith("9")
+        and group != "00"
+        and serial != "0000"
+    )
+
+
+def _valid_phone(text: str) -> bool:
+    return 10 <= len(_digits(text)) <= 15
+
+
+def _date_label(text: str, start: int, floor: int = 0) -> Optional[str]:
+    # The keyword closest to the date wins ("DOB: ..., issued ..."), a keyword
+    # before an earlier date (from `floor` on) belongs to that date
+    context = text[max(start - DATE_CONTEXT_CHARS, floor) : start]
+    best, best_end = None, -1
+    for label, pattern in DATE_CONTEXT:
+        for match in pattern.finditer(context):
+            if match.end() > best_end:
+                best, best_end = label, match.end()
+    return best
+
+
+# (label, pattern, validator) in priority order, earlier rules win overlaps
+RULES: List[Tuple[str, re.Pattern, Callable[[re.Match], bool]]] = [
+    ("Email Address", EMAIL_PATTERN, lambda m: True),
+    ("IP Address", IPV4_PATTERN, lambda m: _valid_ip(m.group())),
+    ("IP Address", IPV6_PATTERN, lambda m: _valid_ipv6(m.group())),
+    ("Social Security Number", SSN_PATTERN, _valid_ssn),
+    ("Credit Card Number", CREDIT_CARD_PATTERN, lambda m: _valid_credit_card(m.group())),
+    ("Phone Number", PHONE_PATTERN, lambda m: _valid_phone(m.group())),
+]
+
+
+def detect_rule_entities(text: str, labels: Optional[List[str]] = None) -> List[Dict]:
+    """Find structured PII with precompiled patterns and checksums.
+
+    Returns entity dicts shaped like the NER output (text, label, start, end,
+    score), sorted by start offset, without overlapping spans.
+    """
+    entities = []
+    taken: List[Tuple[int, int]] = []
+
+    def claim(label: str, start: int, end: int):
+        if labels is not None and label not in labels:
+            return
+        if any(start < other_end and other_start < end for other_start, other_end in taken):
+            return
+        taken.append((start, end))
+        entities.append(
+            {"text": text[start:end], "label": label, "start": start, "end": end, "score": 1.0}
+        )
+
+    for label, pattern, validate in RULES:
+        for match in pattern.finditer(text):
+            if validate(match):
+                claim(label, match.start(), match.end())
+
+    # Dates only count as PII when a keyword says what kind of date they are
+    previous_end = 0
+    for match in DATE_PATTERN.finditer(text):
+        label = _date_label(text, match.start(), previous_end)
+        if label is not None:
+            claim(label, match.start(), match.end())
+        previous_end = match.end()
+
+    entities.sort(key=lambda entity: entity["start"])
+    return entities
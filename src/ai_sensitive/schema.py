@@ -1,4 +1,5 @@
-from typing import List
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Tuple
 
 
 class Word:
@@ -14,30 +15,111 @@ class Word:
 
 
 class Line:
-    def __init__(self):
-        self.words: List[Word] = []  # List to store words in this line
+    """A line of words, either built word by word or viewed from a WordTable."""
+
+    def __init__(self, table=None, index: Optional[int] = None):
+        self._table = table  # Backing ai_sensitive.layout.WordTable, if any
+        self._index = index
+        self._words: Optional[List[Word]] = None if table is not None else []
+
+    @property
+    def words(self) -> List[Word]:
+        # Word objects are only materialised when someone asks for them
+        if self._words is None:
+            start, stop = self._table.line_range(self._index)
+            self._words = [self._table.word(i) for i in range(start, stop)]
+        return self._words
 
     def add_word(self, word: Word):
         self.words.append(word)
+        self._table = None  # Detached from the table once edited
 
     def get_text(self):
+        if self._table is not None:
+            return self._table.line_text(self._index)
         # Concatenate words to form the line's text
         return " ".join(word.text for word in self.words)
 
+    @property
+    def bbox(self) -> Tuple[int, int, int, int]:
+        """(x_min, y_min, x_max, y_max) of the line."""
+        if self._table is not None:
+            return tuple(int(v) for v in self._table.line_boxes[self._index])
+        return (
+            min(word.x for word in self.words),
+            min(word.y for word in self.words),
+            max(word.x + word.width for word in self.words),
+            max(word.y + word.height for word in self.words),
+        )
+
     def __repr__(self):
         return f"Line(words={self.words})"
 
 
 class Paragraph:
-    def __init__(self):
-        self.lines: List[Line] = []  # List to store lines in this paragraph
+    """A group of lines, either built line by line or viewed from a WordTable."""
+
+    def __init__(self, table=None, index: Optional[int] = None):
+        self._table = table  # Backing ai_sensitive.layout.WordTable, if any
+        self._index = index
+        self._lines: Optional[List[Line]] = None if table is not None else []
+        self._word_starts: Optional[List[int]] = None  # Char offset of each word
+        self._words: Optional[List[Word]] = None
+
+    @property
+    def lines(self) -> List[Line]:
+        if self._lines is None:
+            start, stop = self._table.paragraph_range(self._index)
+            self._lines = [Line(self._table, i) for i in range(start, stop)]
+        return self._lines
 
     def add_line(self, line: Line):
         self.lines.append(line)
+        self._table = None  # Detached from the table once edited
+        self._word_starts = self._words = None
+
+    @property
+    def words(self) -> List[Word]:
+        if self._words is None:
+            self._words = [word for line in self.lines for word in line.words]
+        return self._words
+
+    def words_in_span(self, start: int, end: int) -> List[Word]:
+        """Words overlapping the character span [start, end) of get_text()."""
+        if self._word_starts is None:
+            # get_text() joins every word with a single space
+            offsets, offset = [], 0
+            for word in self.words:
+                offsets.append(offset)
+                offset += len(word.text) + 1
+            self._word_starts = offsets
+
+        first = max(bisect_right(self._word_starts, start) - 1, 0)
+        if first < len(self.words) and (
+            self._word_starts[first] + len(self.words[first].text) <= start
+        ):
+            first += 1  # Span starts in the space after this word
+        last = bisect_left(self._word_starts, end)
+        return self.words[first:last]
 
     def get_text(self):
+        if self._table is not None:
+            return self._table.paragraph_text(self._index)
         # Concatenate line texts to form the paragraph's text
         return " ".join(line.get_text() for line in self.lines)
 
+    @property
+    def bbox(self) -> Tuple[int, int, int, int]:
+        """(x_min, y_min, x_max, y_max) of the paragraph."""
+        if self._table is not None:
+            return tuple(int(v) for v in self._table.paragraph_boxes[self._index])
+        boxes = [line.bbox for line in self.lines]
+        return (
+            min(box[0] for box in boxes),
+            min(box[1] for box in boxes),
+            max(box[2] for box in boxes),
+            max(box[3] for box in boxes),
+        )
+
     def __repr__(self):
         return f"Paragraph(lines={self.lines})"
@@ -1,54 +1,231 @@
-from typing import List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from .sensitive_info_utils import detect_sensitive_information, load_model
+from .sensitive_info_utils import (
+    detect_ner_candidates_batch,
+    load_model,
+    ner_labels,
+    resolve_entities,
+)
 from .ocr_document import OCRDocument
+from .pipeline_report import stage
+from .result_cache import content_hash, get_result_cache
 from .schema import Paragraph
 
-from setting import debug_flag
+from setting import (
+    debug_flag,
+    ner_batch_size,
+    model_name,
+    ner_backend,
+    ner_chunk_size,
+    ner_chunk_overlap,
+    onnx_quantize,
+    sensitive_labels,
+    ner_threshold,
+    ner_score_floor,
+)
 
 
 class SensitiveAIDetector:
     def __init__(self, ocr: OCRDocument):
         self.ocr: OCRDocument = ocr
+        self.paragraph_info: List[List[dict]] = []  # Entities per paragraph
+        # Raw NER candidates per paragraph and the labels they were computed
+        # for, `paragraph_info` is filtered from them
+        self.paragraph_candidates: List[List[dict]] = []
+        self.computed_labels: List[str] = []
+        self._candidates_loaded = False
 
-    def get_sensitive_info(self) -> None:
+    def get_sensitive_info(
+        self,
+        batch_size: int = ner_batch_size,
+        labels: Optional[List[str]] = None,
+        threshold: Optional[float] = None,
+    ) -> List[dict]:
+        """Detect with the given labels and threshold (settings by default).
+
+        Calling it again with other values only runs the model for labels
+        that were never computed for this document.
+        """
         print("Detecting sensitive information...")
-        paragraphs = self.ocr.paragraphs
+        self.get_sensitive_info_batch([self], batch_size, labels, threshold)
+        return self.collect_sensitive_info()
 
+    def collect_sensitive_info(self) -> List[dict]:
+        """Flatten the per-paragraph results of the last detection."""
         sensitive_info = []
+        for info in self.paragraph_info:
+            sensitive_info.extend(info)
+        return sensitive_info
+
+    @staticmethod
+    def _cache_key(paragraph_texts: List[str]) -> str:
+        return content_hash(
+            paragraph_texts,
+            model_name,
+            ner_backend,
+            onnx_quantize if ner_backend == "onnx" else None,
+            ner_chunk_size,
+            ner_chunk_overlap,
+            ner_score_floor,
+        )
+
+    def _paragraph_texts(self) -> List[str]:
+        return [p.get_text() for p in self.ocr.paragraphs]
+
+    def _load_candidates(self, paragraph_texts: List[str], cache) -> Optional[str]:
+        # Start from the cached candidates of these paragraphs, if any, and
+        # return the cache key to store new ones under
+        key = self._cache_key(paragraph_texts) if cache is not None else None
+        if self._candidates_loaded:
+            return key
+        self.paragraph_candidates = [[] for _ in paragraph_texts]
+        self.computed_labels = []
+        if cache is not None:
+            cached = cache.get("ner", key)
+            if cached is not None:
+                self.paragraph_candidates = cached["candidates"]
+                self.computed_labels = cached["labels"]
+        self._candidates_loaded = True
+        return key
 
-        ai_model = load_model()
-        for paragraph in paragraphs:
-            sensitive_info.extend(
-                detect_sensitive_information(ai_model, paragraph.get_text())
+    def _store_candidates(self, key: Optional[str], cache):
+        if cache is not None:
+            cache.put(
+                "ner",
+                key,
+                {"labels": self.computed_labels, "candidates": self.paragraph_candidates},
             )
 
-        return sensitive_info
+    def refilter(
+        self, labels: Optional[List[str]] = None, threshold: Optional[float] = None
+    ) -> List[List[dict]]:
+        """Rebuild `paragraph_info` from the stored candidates, no model call.
+
+        Labels whose candidates were never computed only get rule matches,
+        use `get_sensitive_info` to fill them in.
+        """
+        labels = sensitive_labels if labels is None else labels
+        threshold = ner_threshold if threshold is None else threshold
+        paragraph_texts = self._paragraph_texts()
+        with stage("resolve"):
+            self.paragraph_info = [
+                resolve_entities(text, candidates, labels, threshold)
+                for text, candidates in zip(paragraph_texts, self.paragraph_candidates)
+            ]
+        if debug_flag:
+            for entity in self.collect_sensitive_info():
+                print(entity["text"], "=>", entity["label"])
+        return self.paragraph_info
+
+    @staticmethod
+    def get_sensitive_info_batch(
+        detectors: List["SensitiveAIDetector"],
+        batch_size: int = ner_batch_size,
+        labels: Optional[List[str]] = None,
+        threshold: Optional[float] = None,
+    ) -> None:
+        """Run NER over the paragraphs of many documents in shared batches.
+
+        Only labels a document has no candidates for (from an earlier call or
+        the cache) go through the model, then each detector's `paragraph_info`
+        is filtered from its candidates.
+        """
+        cache = get_result_cache()
+        wanted = ner_labels(labels)
+        # Documents missing the same labels share batches
+        groups: Dict[Tuple[str, ...], list] = {}
+        for detector in detectors:
+            paragraph_texts = detector._paragraph_texts()
+            key = detector._load_candidates(paragraph_texts, cache)
+            missing = tuple(l for l in wanted if l not in detector.computed_labels)
+            if missing:
+                groups.setdefault(missing, []).append((detector, paragraph_texts, key))
+
+        for missing, group in groups.items():
+            texts = []
+            owners = []  # (detector, paragraph index) for every text
+            for detector, paragraph_texts, _ in group:
+                for index, text in enumerate(paragraph_texts):
+                    texts.append(text)
+                    owners.append((detector, index))
+            results = detect_ner_candidates_batch(
+                load_model(), texts, list(missing), batch_size
+            )
+            for (detector, index), candidates in zip(owners, results):
+                detector.paragraph_candidates[index].extend(candidates)
+            for detector, _, key in group:
+                detector.computed_labels.extend(missing)
+                detector._store_candidates(key, cache)
+
+        for detector in detectors:
+            detector.refilter(labels, threshold)
+
+    def iter_sensitive_info(
+        self,
+        batch_size: int = ner_batch_size,
+        labels: Optional[List[str]] = None,
+        threshold: Optional[float] = None,
+    ) -> Iterator[Tuple[int, List[dict]]]:
+        """Detect in document order, yielding (paragraph index, entities).
+
+        Paragraphs still go through the model `batch_size` at a time, results
+        are handed out as soon as their batch is done. If the caller stops
+        early the new candidates are dropped.
+        """
+        labels = sensitive_labels if labels is None else labels
+        threshold = ner_threshold if threshold is None else threshold
+        cache = get_result_cache()
+        paragraph_texts = self._paragraph_texts()
+        key = self._load_candidates(paragraph_texts, cache)
+        missing = [l for l in ner_labels(labels) if l not in self.computed_labels]
+
+        self.paragraph_info = [[] for _ in paragraph_texts]
+        new_candidates = [[] for _ in paragraph_texts]
+        ai_model = load_model() if missing else None
+        for start in range(0, len(paragraph_texts), batch_size):
+            texts = paragraph_texts[start : start + batch_size]
+            if missing:
+                new_candidates[start : start + batch_size] = detect_ner_candidates_batch(
+                    ai_model, texts, missing, batch_size
+                )
+            for index, text in enumerate(texts, start):
+                with stage("resolve"):
+                    info = resolve_entities(
+                        text,
+                        self.paragraph_candidates[index] + new_candidates[index],
+                        labels,
+                        threshold,
+                    )
+                self.paragraph_info[index] = info
+                yield index, info
+
+        if missing:
+            for candidates, found in zip(self.paragraph_candidates, new_candidates):
+                candidates.extend(found)
+            self.computed_labels.extend(missing)
+            self._store_candidates(key, cache)
 
     def back_locate_sensitive_info(
-        self, paragraphs: List[Paragraph], sensitive_info: List[str]
+        self, paragraphs: List[Paragraph], paragraph_info: List[List[dict]]
+    ) -> List[Tuple[int, int, int, int]]:
+        """Map each entity's character span to the word boxes it covers."""
+        coordinates = {}  # Ordered set, a word covered twice is blocked once
+        for paragraph, entities in zip(paragraphs, paragraph_info):
+            for entity in entities:
+                for word in paragraph.words_in_span(entity["start"], entity["end"]):
+                    coordinate = (word.x, word.y, word.width, word.height)
+                    coordinates[coordinate] = None
+                    if debug_flag:
+                        print(f"Sensitive Info: {entity['text']}")
+                        print(f"Coordinates: {coordinate}")
+                        print("\n")
+
+        return list(coordinates)
+
+    def process(
+        self, paragraph_info: List[List[dict]] = None
     ) -> List[Tuple[int, int, int, int]]:
-        coordinates = []
-        for paragraph in paragraphs:
-            for info in sensitive_info:
-                if info in paragraph.get_text():
-                    for line in paragraph.lines:
-                        for word in line.words:
-                            for info_word in info.split():
-                                if info_word in word.text:
-                                    coordinate = (
-                                        word.x,
-                                        word.y,
-                                        word.width,
-                                        word.height,
-                                    )
-                                    coordinates.append(coordinate)
-                                    if debug_flag:
-                                        print(f"Sensitive Info: {info}")
-                                        print(f"Coordinates: {coordinate}")
-                                        print("\n")
-
-        return coordinates
-
-    def process(self, sensitive_info: List[str]) -> None:
-        return self.back_locate_sensitive_info(self.ocr.paragraphs, sensitive_info)
+        if paragraph_info is None:
+            paragraph_info = self.paragraph_info
+        with stage("back_location"):
+            return self.back_locate_sensitive_info(self.ocr.paragraphs, paragraph_info)
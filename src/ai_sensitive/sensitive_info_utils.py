@@ -1,39 +1,299 @@
-import importlib
+from .lazy_modules import lazy_import
 
+# Use the lazy import function
+gliner = lazy_import("gliner")
 
-# Define a function to lazily import a module
-def lazy_import(module_name):
-    def _import():
-        return importlib.import_module(module_name)
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
 
-    return _import
+from .onnx_model import load_onnx_model
+from .pipeline_report import count, resident_memory as _resident_memory, stage
+from .rule_detector import RULE_COVERED_LABELS, detect_rule_entities
+from .text_chunker import chunk_text, merge_chunk_entities
 
+from setting import (
+    sensitive_labels,
+    model_name,
+    model_device,
+    ner_backend,
+    ner_batch_size,
+    ner_chunk_size,
+    ner_chunk_overlap,
+    rule_detectors_enabled,
+    rule_labels_skip_ner,
+    ner_threshold,
+    ner_score_floor,
+    debug_flag,
+)
 
-# Use the lazy import function
-gliner = lazy_import("gliner")
+NER_BACKENDS = ("torch", "onnx")
+
+
+class ModelRegistry:
+    """Process-wide cache of NER models keyed by (model name, device, backend)."""
+
+    def __init__(self):
+        self._models: Dict[Tuple[str, str, str], object] = {}
+        self._stats: Dict[Tuple[str, str, str], dict] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        name: str = model_name,
+        device: str = model_device,
+        backend: str = ner_backend,
+    ):
+        if backend not in NER_BACKENDS:
+            raise ValueError(
+                f"Unknown NER backend '{backend}', expected one of {NER_BACKENDS}"
+            )
+        key = (name, device, backend)
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        # Only one thread loads a given model, others wait and reuse it
+        with self._lock:
+            if key not in self._models:
+                rss_before = _resident_memory()
+                start = time.perf_counter()
+                with stage("model_load"):
+                    if backend == "onnx":
+                        # onnxruntime runs on the CPU, `device` is not used
+                        model = load_onnx_model(name)
+                    else:
+                        model = gliner().GLiNER.from_pretrained(name)
+                        model = model.to(device)
+                self._stats[key] = {
+                    "model_name": name,
+                    "device": device,
+                    "backend": backend,
+                    "load_seconds": time.perf_counter() - start,
+                    "rss_delta_bytes": _resident_memory() - rss_before,
+                    "warm_up_seconds": None,
+                }
+                self._models[key] = model
+                print(
+                    f"Loaded {name} ({backend}) on {device} in "
+                    f"{self._stats[key]['load_seconds']:.2f}s"
+                )
+            return self._models[key]
+
+    def warm_up(
+        self,
+        name: str = model_name,
+        device: str = model_device,
+        backend: str = ner_backend,
+    ):
+        """Run one small inference so lazy initialisation happens up front."""
+        model = self.get(name, device, backend)
+        start = time.perf_counter()
+        model.predict_entities(
+            "John Doe lives at 1 Main Street.", ner_labels() or sensitive_labels
+        )
+        self._stats[(name, device, backend)]["warm_up_seconds"] = time.perf_counter() - start
+        return model
+
+    def preload(
+        self,
+        name: str = model_name,
+        device: str = model_device,
+        backend: str = ner_backend,
+        warm_up: bool = True,
+    ) -> threading.Thread:
+        """Load (and optionally warm up) a model on a daemon thread."""
+
+        def _preload():
+            try:
+                if warm_up:
+                    self.warm_up(name, device, backend)
+                else:
+                    self.get(name, device, backend)
+            except Exception as e:
+                print(f"Model preload failed: {e}")
+
+        thread = threading.Thread(target=_preload, name="model-preload", daemon=True)
+        thread.start()
+        return thread
+
+    def is_loaded(
+        self,
+        name: str = model_name,
+        device: str = model_device,
+        backend: str = ner_backend,
+    ) -> bool:
+        return (name, device, backend) in self._models
+
+    def stats(self) -> List[dict]:
+        """Load time, warm-up time and memory figures for every loaded model."""
+        rss = _resident_memory()
+        return [dict(stats, rss_bytes=rss) for stats in self._stats.values()]
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+            self._stats.clear()
+
+
+model_registry = ModelRegistry()
+
+
+def load_model(
+    name: Optional[str] = None,
+    device: Optional[str] = None,
+    backend: Optional[str] = None,
+):
+    # Return the process-wide GLiNER instance, loading it on first use
+    return model_registry.get(
+        name or model_name, device or model_device, backend or ner_backend
+    )
+
+
+def preload_model(warm_up: bool = True) -> threading.Thread:
+    # Start loading the default model in the background
+    return model_registry.preload(warm_up=warm_up)
+
+
+def _to_entity(entity) -> dict:
+    # Keep the character offsets so entities can be mapped back to word boxes
+    return {
+        "text": entity["text"],
+        "label": entity["label"],
+        "start": int(entity["start"]),
+        "end": int(entity["end"]),
+        "score": float(entity["score"]),
+    }
+
+
+def ner_labels(labels: Optional[List[str]] = None) -> List[str]:
+    """Labels the NER model is asked for, without those the rules cover."""
+    labels = sensitive_labels if labels is None else labels
+    if rule_detectors_enabled and rule_labels_skip_ner:
+        return [label for label in labels if label not in RULE_COVERED_LABELS]
+    return list(labels)
+
+
+def merge_entities(rule_entities: List[dict], ner_entities: List[dict]) -> List[dict]:
+    """Combine rule and NER results, rule matches win overlapping spans."""
+    merged = list(rule_entities)
+    for entity in ner_entities:
+        if not any(
+            entity["start"] < rule["end"] and rule["start"] < entity["end"]
+            for rule in rule_entities
+        ):
+            merged.append(entity)
+    merged.sort(key=lambda entity: entity["start"])
+    return merged
+
+
+def detect_ner_candidates_batch(
+    model, texts: List[str], labels: List[str], batch_size: int = ner_batch_size
+) -> List[List[dict]]:
+    """Raw NER candidates for `labels`, one list per text.
+
+    Spans scoring at least `ner_score_floor` are returned with every label
+    that reaches it, nested spans included, `resolve_entities` picks the final
+    entities. GLiNER still drops spans that partly overlap a higher scoring
+    one, so turning a label off later cannot bring those back, unlike a
+    fresh run without that label. Long texts
+    are split into overlapping chunks that fit the model's window, chunks of
+    all texts share the batches.
+    """
+    # Never more words than the model reads, it truncates the rest silently
+    max_len = getattr(getattr(model, "config", None), "max_len", None)
+    size = min(ner_chunk_size, max_len) if max_len else ner_chunk_size
+    overlap = ner_chunk_overlap if size == ner_chunk_size else min(ner_chunk_overlap, size // 4)
+
+    # (text index, start, end) of every chunk, empty texts are skipped
+    chunks = [
+        (i, start, end)
+        for i, text in enumerate(texts)
+        if labels and text.strip()
+        for start, end in chunk_text(text, size, overlap)
+    ]
+    chunk_entities = [[] for _ in chunks]
+
+    # Sort by length so each batch pads to a similar size
+    order = sorted(range(len(chunks)), key=lambda c: chunks[c][2] - chunks[c][1])
+    count("ner_chunks", len(chunks), add=True)
+    for start in range(0, len(order), batch_size):
+        indices = order[start : start + batch_size]
+        with stage("ner"):
+            batch_entities = model.batch_predict_entities(
+                [texts[chunks[c][0]][chunks[c][1] : chunks[c][2]] for c in indices],
+                labels,
+                flat_ner=False,
+                threshold=ner_score_floor,
+                multi_label=True,
+            )
+        for c, entities in zip(indices, batch_entities):
+            chunk_entities[c] = [_to_entity(entity) for entity in entities]
+
+    # Put the chunks of every text back together
+    text_chunks = [[] for _ in texts]
+    for (i, start, end), entities in zip(chunks, chunk_entities):
+        text_chunks[i].append(((start, end), entities))
+    return [
+        merge_chunk_entities(
+            text, [span for span, _ in pieces], [found for _, found in pieces]
+        )
+        for text, pieces in zip(texts, text_chunks)
+    ]
 
-from typing import List
 
-from setting import sensitive_labels
+def resolve_entities(
+    text: str,
+    candidates: List[dict],
+    labels: Optional[List[str]] = None,
+    threshold: float = ner_threshold,
+) -> List[dict]:
+    """Final entities of a text from its stored NER candidates.
 
+    Candidates of the wanted labels scoring at least `threshold` are taken
+    highest score first, skipping any that overlap one already taken (as
+    GLiNER's flat decoding does), then merged with the rule matches.
+    """
+    labels = sensitive_labels if labels is None else labels
+    wanted = set(ner_labels(labels))
+    ner_entities = []
+    for entity in sorted(candidates, key=lambda entity: entity["score"], reverse=True):
+        if entity["label"] not in wanted or entity["score"] < threshold:
+            continue
+        if not any(
+            entity["start"] < kept["end"] and kept["start"] < entity["end"]
+            for kept in ner_entities
+        ):
+            ner_entities.append(entity)
+    rule_entities = detect_rule_entities(text, labels) if rule_detectors_enabled else []
+    return merge_entities(rule_entities, ner_entities)
 
-def load_model():
-    # Initialize GLiNER with the base model
-    model = gliner().GLiNER.from_pretrained("urchade/gliner_mediumv2.1")
-    return model
 
+def detect_sensitive_information(model, text: str) -> List[dict]:
+    return detect_sensitive_information_batch(model, [text])[0]
 
-def detect_sensitive_information(model, text: str) -> List[str]:
-    sensitive = []
-    # Perform entity prediction
-    entities = model.predict_entities(text, sensitive_labels, threshold=0.3)
 
-    # Display predicted entities and their labels
-    for entity in entities:
-        print(entity["text"], "=>", entity["label"])
-        sensitive.append(entity["text"])
+def detect_sensitive_information_batch(
+    model,
+    texts: List[str],
+    batch_size: int = ner_batch_size,
+    labels: Optional[List[str]] = None,
+    threshold: float = ner_threshold,
+) -> List[List[dict]]:
+    """Run the rules and NER over many texts, one result list per text.
 
-    return sensitive
+    `model` may be None when no labels are left for NER.
+    """
+    candidates = detect_ner_candidates_batch(model, texts, ner_labels(labels), batch_size)
+    results = []
+    with stage("resolve"):
+        for text, found in zip(texts, candidates):
+            entities = resolve_entities(text, found, labels, threshold)
+            if debug_flag:
+                for entity in entities:
+                    print(entity["text"], "=>", entity["label"])
+            results.append(entities)
+    return results
 
 """ 
 Reference:
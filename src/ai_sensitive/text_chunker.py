@@ -0,0 +1,71 @@
+import re
+from typing import List, Tuple
+
+from setting import ner_chunk_size, ner_chunk_overlap
+
+# GLiNER's own word splitter: every punctuation mark is a word of its own and
+# counts against the model's max_len
+WORD_PATTERN = re.compile(r"\w+(?:[-_]\w+)*|\S")
+
+
+def chunk_text(
+    text: str, size: int = ner_chunk_size, overlap: int = ner_chunk_overlap
+) -> List[Tuple[int, int]]:
+    """Split text into (start, end) character windows of at most `size` words.
+
+    Words are counted the way GLiNER splits them, so a window of `size`
+    words is never truncated by a model whose max_len is at least `size`.
+
+    Consecutive windows share `overlap` words, so an entity cut by one
+    window boundary is seen whole by the neighbouring window.
+    """
+    if overlap >= size:
+        raise ValueError(f"Chunk overlap ({overlap}) must be smaller than size ({size})")
+
+    words = [(m.start(), m.end()) for m in WORD_PATTERN.finditer(text)]
+    if len(words) <= size:
+        return [(0, len(text))]
+
+    chunks = []
+    step = size - overlap
+    for first in range(0, len(words), step):
+        last = min(first + size, len(words)) - 1
+        chunks.append((words[first][0], words[last][1]))
+        if last == len(words) - 1:
+            break
+    return chunks
+
+
+def merge_chunk_entities(
+    text: str, chunks: List[Tuple[int, int]], chunk_entities: List[List[dict]]
+) -> List[dict]:
+    """Shift chunk-local entities to text offsets and drop the duplicates.
+
+    Overlapping entities of different labels are all kept, which one is used
+    depends on the threshold and labels chosen later. Where entities of the
+    same label overlap, one that does not touch an inner chunk boundary (and
+    so was not cut off) wins, then the higher score.
+    """
+    candidates = []
+    for (chunk_start, chunk_end), entities in zip(chunks, chunk_entities):
+        for entity in entities:
+            start = chunk_start + entity["start"]
+            end = chunk_start + entity["end"]
+            clipped = (entity["start"] == 0 and chunk_start > 0) or (
+                end == chunk_end and chunk_end < len(text)
+            )
+            entity = dict(entity, start=start, end=end, text=text[start:end])
+            candidates.append((not clipped, entity["score"], entity))
+
+    merged = []
+    candidates.sort(key=lambda candidate: candidate[:2], reverse=True)
+    for _, _, entity in candidates:
+        if not any(
+            entity["label"] == kept["label"]
+            and entity["start"] < kept["end"]
+            and kept["start"] < entity["end"]
+            for kept in merged
+        ):
+            merged.append(entity)
+    merged.sort(key=lambda entity: entity["start"])
+    return merged
@@ -0,0 +1,114 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .lazy_modules import lazy_module
+
+from setting import text_regions_max_coverage
+
+cv2 = lazy_module("cv2")
+
+Rect = Tuple[int, int, int, int]  # (x0, y0, x1, y1)
+
+ANALYSIS_SIZE = 2000  # Long side of the copy regions are detected on
+MIN_TEXT_HEIGHT = 6  # Component heights in analysis pixels that can be text
+MAX_TEXT_HEIGHT_RATIO = 0.08  # Taller than this fraction of the page is not text
+MIN_EDGE_DENSITY = 0.25  # Share of edge pixels in a text line's box
+
+
+def _merge_rects(rects: List[Rect], gap: int) -> List[Rect]:
+    """Merge rectangles that overlap once grown by `gap` pixels."""
+    rects = sorted(rects, key=lambda r: (r[1], r[0]))
+    merged = True
+    while merged:
+        merged = False
+        result: List[Rect] = []
+        for rect in rects:
+            for index, other in enumerate(result):
+                if (
+                    rect[0] - gap < other[2]
+                    and other[0] - gap < rect[2]
+                    and rect[1] - gap < other[3]
+                    and other[1] - gap < rect[3]
+                ):
+                    result[index] = (
+                        min(rect[0], other[0]),
+                        min(rect[1], other[1]),
+                        max(rect[2], other[2]),
+                        max(rect[3], other[3]),
+                    )
+                    merged = True
+                    break
+            else:
+                result.append(rect)
+        rects = result
+    return sorted(rects, key=lambda r: (r[1], r[0]))
+
+
+def detect_text_regions(
+    gray: np.ndarray, max_coverage: float = text_regions_max_coverage
+) -> Optional[List[Rect]]:
+    """Find the parts of a page that look like text, without a learned model.
+
+    A morphological gradient marks character edges, a wide closing joins the
+    characters of a line, and connected components that are line-shaped and
+    dense in edges are kept. Nearby lines are merged into blocks so Tesseract
+    still sees some layout. Returns None, meaning OCR the whole page, when
+    nothing passes the filters or text covers more than `max_coverage` of
+    the page, where OCR'ing crops would not save anything.
+    """
+    height, width = gray.shape[:2]
+    factor = min(ANALYSIS_SIZE / max(width, height), 1.0)
+    small = (
+        cv2.resize(gray, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA)
+        if factor < 1.0
+        else gray
+    )
+
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+    gradient = cv2.morphologyEx(small, cv2.MORPH_GRADIENT, kernel)
+    _, edges = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    lines = cv2.morphologyEx(
+        edges, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (9, 1))
+    )
+
+    count, _, stats, _ = cv2.connectedComponentsWithStats(lines, connectivity=8)
+    max_height = MAX_TEXT_HEIGHT_RATIO * small.shape[0]
+    rects = []
+    heights = []
+    for x, y, w, h, _ in stats[1:count]:
+        if not MIN_TEXT_HEIGHT <= h <= max_height or w < h * 0.5:
+            continue
+        density = np.count_nonzero(edges[y : y + h, x : x + w]) / float(w * h)
+        if density < MIN_EDGE_DENSITY:
+            continue
+        rects.append((int(x), int(y), int(x + w), int(y + h)))
+        heights.append(int(h))
+    if not rects:
+        # Nothing looked like text (faint or low-contrast scan), let the
+        # whole page be OCR'd rather than reporting it empty
+        return None
+
+    # Grow by about a line height so words, lines and paragraphs join up
+    gap = max(int(np.median(heights)), 2)
+    rects = _merge_rects(rects, gap)
+
+    scale = 1.0 / factor
+    # Half a line at full resolution, Tesseract reads poorly right at a crop border
+    pad = int(gap * scale) // 2
+    regions = [
+        (
+            max(int(x0 * scale) - pad, 0),
+            max(int(y0 * scale) - pad, 0),
+            min(int(np.ceil(x1 * scale)) + pad, width),
+            min(int(np.ceil(y1 * scale)) + pad, height),
+        )
+        for x0, y0, x1, y1 in rects
+    ]
+    # Padding can make neighbours overlap again, which would OCR words twice
+    regions = _merge_rects(regions, 0)
+
+    covered = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in regions)
+    if covered > max_coverage * width * height:
+        return None
+    return regions
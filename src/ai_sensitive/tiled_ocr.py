@@ -0,0 +1,160 @@
+import atexit
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .ocr_backend import TESSERACT_COLUMNS, get_ocr_backend
+
+Rect = Tuple[int, int, int, int]  # (x0, y0, x1, y1)
+
+_pools: Dict[int, ProcessPoolExecutor] = {}
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    # Pools are reused across pages, starting processes per page is too slow
+    if workers not in _pools:
+        if not _pools:
+            atexit.register(shutdown_pools)
+        # The GUI creates the pool from a worker thread while other threads may
+        # be loading the model, forking then could copy locks they hold, so
+        # workers start from a clean forkserver process (as in server.py)
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context(
+            "forkserver" if "forkserver" in methods else "spawn"
+        )
+        _pools[workers] = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+    return _pools[workers]
+
+
+def shutdown_pools():
+    for pool in _pools.values():
+        pool.shutdown(wait=True, cancel_futures=True)
+    _pools.clear()
+
+
+def _default_workers() -> int:
+    # Inside a pool process (batch CLI, server) the documents are already
+    # spread over the cores, a nested pool per worker would start N x N
+    if multiprocessing.parent_process() is not None:
+        return 1
+    return os.cpu_count() or 1
+
+
+def _axis_tiles(length: int, tile_size: int, overlap: int) -> List[Tuple[int, int, int, int]]:
+    """(start, stop, core_start, core_stop) of the tiles along one axis.
+
+    Cores split the overlap zones in half, so together they partition the axis
+    and every position belongs to exactly one tile's core.
+    """
+    if length <= tile_size:
+        return [(0, length, 0, length)]
+    step = tile_size - overlap
+    starts = list(range(0, length - tile_size, step)) + [length - tile_size]
+    # Each core boundary sits in the middle of the overlap of two neighbours
+    bounds = [0] + [(start + previous + tile_size) // 2 for previous, start in zip(starts, starts[1:])] + [length]
+    return [
+        (start, start + tile_size, bounds[index], bounds[index + 1])
+        for index, start in enumerate(starts)
+    ]
+
+
+def tile_grid(width: int, height: int, tile_size: int, overlap: int):
+    """Overlapping tiles covering the image, as (tile rect, core rect) pairs."""
+    if overlap >= tile_size:
+        raise ValueError("Tile overlap must be smaller than the tile size")
+    return [
+        ((x0, y0, x1, y1), (cx0, cy0, cx1, cy1))
+        for y0, y1, cy0, cy1 in _axis_tiles(height, tile_size, overlap)
+        for x0, x1, cx0, cx1 in _axis_tiles(width, tile_size, overlap)
+    ]
+
+
+def _ocr_tile(image: np.ndarray, languages: str, config: str):
+    # Each pool process keeps its own long-lived backend engine
+    return get_ocr_backend().image_to_data(image, languages, config)
+
+
+def merge_tile_data(results, offsets, cores=None) -> dict:
+    """Merge per-crop Tesseract dicts into one page-level dict.
+
+    Boxes are shifted by each crop's (x, y) offset. With `cores`, a word is
+    kept only if its centre lies in that tile's core, which removes the
+    duplicates read twice in overlap zones. Block numbers are renumbered so
+    blocks from different crops never share an id.
+    """
+    merged = {column: [] for column in TESSERACT_COLUMNS}
+    block_offset = 0
+    for index, (data, (dx, dy)) in enumerate(zip(results, offsets)):
+        core = cores[index] if cores is not None else None
+        max_block = 0
+        for i, text in enumerate(data["text"]):
+            if not text.strip():
+                continue
+            left, top = data["left"][i] + dx, data["top"][i] + dy
+            if core is not None:
+                cx = left + data["width"][i] / 2
+                cy = top + data["height"][i] / 2
+                if not (core[0] <= cx < core[2] and core[1] <= cy < core[3]):
+                    continue
+            for column in TESSERACT_COLUMNS:
+                if column in data:
+                    merged[column].append(data[column][i])
+            merged["left"][-1], merged["top"][-1] = left, top
+            merged["block_num"][-1] = data["block_num"][i] + block_offset
+            max_block = max(max_block, data["block_num"][i])
+        block_offset += max_block
+    return merged
+
+
+def ocr_regions(
+    image: np.ndarray,
+    rects: List[Rect],
+    languages: str,
+    config: str,
+    workers: Optional[int] = None,
+    cores: Optional[List[Rect]] = None,
+) -> dict:
+    """OCR several crops of an image in parallel and merge them in page space.
+
+    Without `workers`, crops are OCR'd in a pool with one process per core,
+    or in-process when already running in a worker process.
+    """
+    workers = workers or _default_workers()
+    crops = [np.ascontiguousarray(image[y0:y1, x0:x1]) for x0, y0, x1, y1 in rects]
+    if workers == 1 or len(crops) == 1:
+        results = [_ocr_tile(crop, languages, config) for crop in crops]
+    else:
+        pool = _get_pool(workers)
+        results = list(
+            pool.map(_ocr_tile, crops, [languages] * len(crops), [config] * len(crops))
+        )
+    return merge_tile_data(results, [(x0, y0) for x0, y0, _, _ in rects], cores)
+
+
+def tiled_image_to_data(
+    image: np.ndarray,
+    languages: str,
+    config: str,
+    tile_size: int,
+    overlap: int,
+    workers: Optional[int] = None,
+) -> dict:
+    """OCR a large image as overlapping tiles in a process pool.
+
+    The overlap should be larger than the widest expected word so every word
+    is fully visible in the tile whose core contains its centre. Lines that
+    cross a vertical tile border end up in separate blocks.
+    """
+    height, width = image.shape[:2]
+    grid = tile_grid(width, height, tile_size, overlap)
+    return ocr_regions(
+        image,
+        [tile for tile, _ in grid],
+        languages,
+        config,
+        workers,
+        cores=[core for _, core in grid],
+    )
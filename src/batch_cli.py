@@ -0,0 +1,267 @@
+"""
+Headless batch redaction.
+
+Usage:
+    python src/batch_cli.py INPUT_DIR_OR_GLOB -o OUTPUT_DIR [--workers N]
+
+For every image, multi-page TIFF or PDF a redacted copy and a JSON sidecar
+with the detected entities and block coordinates per page are written to
+the output directory. Files
+whose sidecar already exists are skipped, so an interrupted run can simply
+be started again.
+"""
+
+import argparse
+import glob
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from ai_sensitive.ocr_document import OCRDocument
+from ai_sensitive.pipeline_report import PipelineReport
+from ai_sensitive.sensitive_ai_detector import SensitiveAIDetector
+from tools.basic_info import BasicInfo
+from tools.document_source import DocumentSource, PageWriter
+from tools.image_buffer import ImageBuffer
+
+from setting import ner_batch_size
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".pdf")
+
+
+def collect_inputs(source: str):
+    """Return (root, sorted image paths) for a directory or glob pattern."""
+    if os.path.isdir(source):
+        root = source
+        paths = [
+            os.path.join(dirpath, name)
+            for dirpath, _, names in os.walk(source)
+            for name in names
+        ]
+    else:
+        paths = glob.glob(source, recursive=True)
+        root = os.path.commonpath([os.path.dirname(p) for p in paths]) if paths else "."
+    paths = [p for p in paths if p.lower().endswith(IMAGE_EXTENSIONS)]
+    return root, sorted(paths)
+
+
+def output_paths(image_path: str, root: str, output_dir: str):
+    """Redacted image and sidecar paths, mirroring the input directory layout.
+
+    The sidecar keeps the input extension (scan.png.json), so inputs sharing
+    a stem, like scan.png and scan.pdf, do not overwrite each other.
+    """
+    relative = os.path.relpath(image_path, root)
+    stem, ext = os.path.splitext(relative)
+    return (
+        os.path.join(output_dir, stem + "_redacted" + ext),
+        os.path.join(output_dir, relative + ".json"),
+    )
+
+
+def _ocr_worker(image_path: str):
+    # Runs in a pool process, pages are decoded and OCR'd one at a time and
+    # only the OCR results (no pixels) and page reports are sent back
+    start = time.perf_counter()
+    ocrs = []
+    reports = []
+    for page in DocumentSource(image_path).pages():
+        report = PipelineReport(image_path)
+        with report.activate():
+            with report.stage("image_load"):
+                buffer = ImageBuffer.from_pil(page)
+            ocrs.append(
+                OCRDocument(
+                    image_path, image=buffer.bgr, gray_image=buffer.gray, dpi=buffer.dpi
+                )
+            )
+        reports.append(report)
+    return ocrs, reports, time.perf_counter() - start
+
+
+class BatchRedactor:
+    def __init__(self, root: str, output_dir: str, batch_size: int = ner_batch_size):
+        self.root = root
+        self.output_dir = output_dir
+        self.batch_size = batch_size
+
+        self.done = 0
+        self.failed = 0
+        self.total = 0
+        self.ocr_seconds = 0.0
+        self.ner_seconds = 0.0
+
+        # OCR results are handed to a single NER worker that owns the model
+        self._queue: "queue.Queue" = queue.Queue(maxsize=64)
+        self._lock = threading.Lock()
+
+    def run(self, image_paths, workers: int):
+        pending = []
+        skipped = 0
+        for image_path in image_paths:
+            if os.path.exists(output_paths(image_path, self.root, self.output_dir)[1]):
+                skipped += 1
+            else:
+                pending.append(image_path)
+        self.total = len(pending)
+        print(f"{len(pending)} file(s) to process, {skipped} already done")
+
+        start = time.perf_counter()
+        ner_thread = threading.Thread(target=self._ner_loop, name="ner-worker")
+        ner_thread.start()
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(_ocr_worker, path): path for path in pending}
+                for future in as_completed(futures):
+                    image_path = futures[future]
+                    try:
+                        ocrs, reports, seconds = future.result()
+                    except Exception as e:
+                        self._report(image_path, f"OCR failed: {e}", failed=True)
+                        continue
+                    self.ocr_seconds += seconds
+                    self._queue.put((image_path, ocrs, reports))
+        finally:
+            self._queue.put(None)
+            ner_thread.join()
+
+        self._summary(time.perf_counter() - start, skipped)
+
+    def _ner_loop(self):
+        finished = False
+        while not finished:
+            # Take whatever OCR results are ready so NER can batch across files
+            items = [self._queue.get()]
+            while len(items) < self.batch_size:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in items:
+                finished = True
+                items = [item for item in items if item is not None]
+            if items:
+                self._detect_and_write(items)
+
+    def _detect_and_write(self, items):
+        # One detector per page, all pages of all ready files share NER batches
+        jobs = [
+            (image_path, [SensitiveAIDetector(ocr) for ocr in ocrs], reports)
+            for image_path, ocrs, reports in items
+        ]
+
+        # The NER batch is shared, every page's report gets its stages
+        batch_report = PipelineReport("ner batch")
+        start = time.perf_counter()
+        try:
+            with batch_report.activate():
+                SensitiveAIDetector.get_sensitive_info_batch(
+                    [detector for _, detectors, _ in jobs for detector in detectors],
+                    self.batch_size,
+                )
+        except Exception as e:
+            for image_path, _, _ in jobs:
+                self._report(image_path, f"NER failed: {e}", failed=True)
+            return
+        self.ner_seconds += time.perf_counter() - start
+
+        pages = sum(len(detectors) for _, detectors, _ in jobs)
+        for image_path, detectors, reports in jobs:
+            for report in reports:
+                report.include_stages(batch_report)
+                report.count("ner_batch_pages", pages)
+            try:
+                self._write(image_path, detectors, reports)
+            except Exception as e:
+                self._report(image_path, f"write failed: {e}", failed=True)
+
+    def _write(self, image_path: str, detectors, reports):
+        image_out, sidecar_out = output_paths(image_path, self.root, self.output_dir)
+        os.makedirs(os.path.dirname(image_out), exist_ok=True)
+
+        # Pages are decoded again one by one and appended to the output as
+        # they are redacted, so memory stays bounded by a single page
+        pages = []
+        with PageWriter(image_out) as writer:
+            for index, (page, detector, report) in enumerate(
+                zip(DocumentSource(image_path).pages(), detectors, reports)
+            ):
+                basic_info = BasicInfo(image_path, image=page)
+                # Continue the page's report from the OCR worker
+                basic_info.report = report
+                basic_info.ocr = detector.ocr
+                basic_info.sensitive_ai_detector = detector
+                basic_info.sensitive_info = detector.collect_sensitive_info()
+                basic_info.apply_sensitive_info()
+                with basic_info.report.stage("save"):
+                    writer.write(basic_info.image_tools.get_processed_image())
+                basic_info.finish_report()
+                pages.append(
+                    {
+                        "page": index + 1,
+                        "sensitive_info": basic_info.sensitive_info,
+                        "coordinates": [
+                            list(map(int, c)) for c in basic_info.sensitive_coordinates
+                        ],
+                    }
+                )
+
+        # The sidecar is written last and atomically, it marks the file as done
+        sidecar = {
+            "source": image_path,
+            "output": writer.paths,
+            "pages": pages,
+        }
+        tmp_path = sidecar_out + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(sidecar, f, indent=2)
+        os.replace(tmp_path, sidecar_out)
+
+        blocks = sum(len(page["coordinates"]) for page in pages)
+        self._report(image_path, f"{len(pages)} page(s), {blocks} block(s)")
+
+    def _report(self, image_path: str, message: str, failed: bool = False):
+        with self._lock:
+            self.done += 1
+            self.failed += failed
+            print(f"[{self.done}/{self.total}] {image_path}: {message}")
+
+    def _summary(self, elapsed: float, skipped: int):
+        succeeded = self.done - self.failed
+        print("\nSummary")
+        print(f"  processed: {succeeded}, failed: {self.failed}, skipped: {skipped}")
+        print(f"  wall time: {elapsed:.2f}s")
+        if elapsed > 0:
+            print(f"  throughput: {succeeded / elapsed:.2f} files/sec")
+        print(f"  OCR time (sum over workers): {self.ocr_seconds:.2f}s")
+        print(f"  NER time: {self.ner_seconds:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Redact a directory of images headlessly.")
+    parser.add_argument("source", help="Input directory or glob pattern")
+    parser.add_argument("-o", "--output", required=True, help="Output directory")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="OCR worker processes (default: number of cores)",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=ner_batch_size, help="Paragraphs per NER batch"
+    )
+    args = parser.parse_args()
+
+    root, image_paths = collect_inputs(args.source)
+    if not image_paths:
+        parser.error(f"no images found in {args.source}")
+
+    os.makedirs(args.output, exist_ok=True)
+    BatchRedactor(root, args.output, args.batch_size).run(image_paths, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Peak memory of loading one image for OCR, redaction and display.
+
+"legacy" reproduces the previous decode path: cv2.imread plus a grayscale
+conversion and a full copy for OCRDocument, Image.open plus .copy() for
+ImageTools, a QPixmap-sized decode for the viewer and a tobytes() copy per
+refresh. "shared" uses one tools.image_buffer.ImageBuffer for all of them.
+Each mode runs in a fresh interpreter so peak RSS is not shared.
+
+Usage (from the src directory):
+    python -m benchmarks.image_memory path/to/large_scan.png
+"""
+
+import argparse
+import resource
+import subprocess
+import sys
+
+import cv2
+from PIL import Image
+
+
+def peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def legacy(image_path: str):
+    image = cv2.imread(image_path)  # OCRDocument
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    block_image = image.copy()
+    pil_image = Image.open(image_path)  # ImageTools
+    pil_image.load()
+    process_image = pil_image.copy()
+    viewer = cv2.imread(image_path)  # Stand-in for QPixmap(image_path)
+    refresh = process_image.tobytes("raw", "RGB")  # _convert_pillow_to_qpixmap
+    return image, gray, block_image, pil_image, process_image, viewer, refresh
+
+
+def shared(image_path: str):
+    from tools.image_tools import ImageTools
+    from tools.image_buffer import ImageBuffer
+
+    buffer = ImageBuffer.open(image_path)
+    gray = buffer.gray  # OCRDocument
+    bgr = buffer.bgr
+    tools = ImageTools(buffer=buffer)  # Adds the processed copy
+    views = (buffer.pil(), tools.process_image)
+    try:
+        views += (tools.process_buffer.qimage(),)
+    except ImportError:
+        pass  # PySide6 not installed, the QImage view costs no pixels anyway
+    return buffer, gray, bgr, tools, views
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("image", help="Image to load")
+    parser.add_argument("--mode", choices=("legacy", "shared"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        # Child process: load once in the requested mode and report peak RSS
+        baseline = peak_rss_bytes()
+        kept = legacy(args.image) if args.mode == "legacy" else shared(args.image)
+        print(peak_rss_bytes() - baseline)
+        return
+
+    with Image.open(args.image) as image:
+        width, height = image.size
+    print(f"Image: {args.image} ({width} x {height}, {width * height / 1e6:.1f} MP)")
+    results = {}
+    for mode in ("legacy", "shared"):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.image_memory", args.image, "--mode", mode],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        results[mode] = int(output.stdout.strip().splitlines()[-1])
+        print(f"{mode:>7}: peak +{results[mode] / 2**20:8.1f} MiB")
+    print(f"Reduction: {1 - results['shared'] / max(results['legacy'], 1):.0%}")
+
+
+if __name__ == "__main__":
+    main()
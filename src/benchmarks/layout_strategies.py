@@ -0,0 +1,80 @@
+"""
+Compare the "tesseract" and "kmeans" layout strategies on sample documents.
+
+Both strategies group the same OCR output, so the OCR itself runs once per
+image and only the grouping step is timed. Agreement is the adjusted Rand
+index between the two word->line and word->paragraph assignments.
+
+Usage (from the src directory):
+    python -m benchmarks.layout_strategies path/to/img1.png path/to/img2.png
+"""
+
+import argparse
+import time
+
+import numpy as np
+from sklearn.metrics import adjusted_rand_score
+
+from ai_sensitive.layout import WordTable
+from ai_sensitive.ocr_document import OCRDocument
+
+
+def word_ids(starts: np.ndarray, total: int) -> np.ndarray:
+    """Expand group start offsets into one group id per element."""
+    ids = np.zeros(total, dtype=np.int64)
+    if len(starts) > 1:
+        ids[starts[1:]] = 1
+    return np.cumsum(ids)
+
+
+def compare(image_path: str, repeat: int):
+    document = OCRDocument(image_path, strategy="tesseract")
+    data = document.ocr_data
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        tesseract_table = WordTable.from_tesseract(data)
+        tesseract_table.group_by_tesseract_ids()
+    tesseract_seconds = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        line_threshold, paragraph_threshold = document._auto_adjust_thresholds(data)
+        kmeans_table = WordTable.from_tesseract(data)
+        kmeans_table.group(line_threshold, paragraph_threshold)
+    kmeans_seconds = (time.perf_counter() - start) / repeat
+
+    n = len(tesseract_table)
+    line_agreement = adjusted_rand_score(
+        word_ids(tesseract_table.line_starts, n),
+        word_ids(kmeans_table.line_starts, n),
+    )
+    # Paragraph ids per word: the paragraph id of the word's line
+    paragraph_agreement = adjusted_rand_score(
+        *[
+            word_ids(t.paragraph_starts, t.line_count)[
+                word_ids(t.line_starts, n)
+            ]
+            for t in (tesseract_table, kmeans_table)
+        ]
+    )
+    return n, tesseract_seconds, kmeans_seconds, line_agreement, paragraph_agreement
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("images", nargs="+", help="Sample images")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions")
+    args = parser.parse_args()
+
+    print(f"{'image':40} {'words':>6} {'tess ms':>8} {'kmeans ms':>10} {'line ARI':>9} {'para ARI':>9}")
+    for image_path in sorted(args.images):
+        words, tess, kmeans, lines, paragraphs = compare(image_path, args.repeat)
+        print(
+            f"{image_path[-40:]:40} {words:6d} {tess * 1000:8.2f} {kmeans * 1000:10.2f} "
+            f"{lines:9.3f} {paragraphs:9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Load test for the HTTP redaction service (src/server.py).
+
+Posts the sample images round-robin from a number of concurrent clients and
+reports latency percentiles, throughput and the status codes seen (503 means
+the server shed load).
+
+Usage (from the src directory, with the server running):
+    python -m benchmarks.load_test path/to/img1.png path/to/img2.png \\
+        --requests 200 --concurrency 16 --url http://127.0.0.1:8080/redact
+"""
+
+import argparse
+import asyncio
+import collections
+import time
+from urllib.parse import urlsplit
+
+
+async def post(host: str, port: int, path: str, body: bytes):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(
+            (
+                f"POST {path} HTTP/1.1\r\n"
+                f"Host: {host}:{port}\r\n"
+                "Content-Type: application/octet-stream\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n"
+            ).encode()
+            + body
+        )
+        await writer.drain()
+        response = await reader.read()  # The server closes the connection
+    finally:
+        writer.close()
+    return int(response.split(b" ", 2)[1])
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+async def run(url: str, bodies, total: int, concurrency: int):
+    parts = urlsplit(url)
+    host, port, path = parts.hostname, parts.port or 80, parts.path or "/redact"
+    latencies = []
+    statuses = collections.Counter()
+    counter = iter(range(total))
+
+    async def client():
+        for index in counter:
+            start = time.perf_counter()
+            try:
+                status = await post(host, port, path, bodies[index % len(bodies)])
+            except OSError:
+                status = "connection error"
+            statuses[status] += 1
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return time.perf_counter() - start, latencies, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("images", nargs="+", help="Sample images to upload")
+    parser.add_argument("--url", default="http://127.0.0.1:8080/redact")
+    parser.add_argument("--requests", type=int, default=100, help="Total requests")
+    parser.add_argument("--concurrency", type=int, default=8, help="Parallel clients")
+    args = parser.parse_args()
+
+    bodies = []
+    for path in args.images:
+        with open(path, "rb") as f:
+            bodies.append(f.read())
+
+    elapsed, latencies, statuses = asyncio.run(
+        run(args.url, bodies, args.requests, args.concurrency)
+    )
+    print(f"{args.requests} requests, {args.concurrency} clients, {elapsed:.2f}s")
+    print(f"  status codes: {dict(statuses)}")
+    if latencies:
+        print(f"  p50 latency: {percentile(latencies, 0.50) * 1000:.1f} ms")
+        print(f"  p99 latency: {percentile(latencies, 0.99) * 1000:.1f} ms")
+        print(f"  throughput: {len(latencies) / elapsed:.2f} requests/s (200 only)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Latency, throughput and entity agreement of the torch and ONNX NER backends.
+
+Paragraph texts are taken from OCR of the sample images, then every backend
+runs over them one paragraph at a time (latency) and in batches
+(throughput). Entities are compared with the torch backend as reference.
+
+Usage (from the src directory):
+    python -m benchmarks.ner_backends path/to/img1.png path/to/img2.png --threads 4
+"""
+
+import argparse
+import time
+
+from ai_sensitive.ocr_document import OCRDocument
+from ai_sensitive.onnx_model import load_onnx_model
+from ai_sensitive.sensitive_info_utils import load_model, ner_labels
+
+from setting import model_name, ner_batch_size, ner_threshold
+
+
+def predict(model, texts, batch_size):
+    entities = []
+    for start in range(0, len(texts), batch_size):
+        batch = texts[start : start + batch_size]
+        for index, found in enumerate(
+            model.batch_predict_entities(batch, ner_labels(), threshold=ner_threshold)
+        ):
+            entities.extend(
+                (start + index, e["start"], e["end"], e["label"]) for e in found
+            )
+    return set(entities)
+
+
+def measure(model, texts, batch_size):
+    predict(model, texts[:1], 1)  # Warm up
+
+    start = time.perf_counter()
+    for text in texts:
+        predict(model, [text], 1)
+    latency = (time.perf_counter() - start) / len(texts)
+
+    start = time.perf_counter()
+    entities = predict(model, texts, batch_size)
+    throughput = len(texts) / (time.perf_counter() - start)
+    return latency, throughput, entities
+
+
+def agreement(reference, entities):
+    # Entity-level precision/recall/F1 against the reference backend
+    matched = len(reference & entities)
+    precision = matched / len(entities) if entities else 1.0
+    recall = matched / len(reference) if reference else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return precision, recall, f1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("images", nargs="+", help="Sample images")
+    parser.add_argument("--batch-size", type=int, default=ner_batch_size)
+    parser.add_argument("--threads", type=int, default=None, help="onnxruntime threads")
+    args = parser.parse_args()
+
+    texts = [
+        paragraph.get_text()
+        for path in sorted(args.images)
+        for paragraph in OCRDocument(path).paragraphs
+    ]
+    texts = [text for text in texts if text.strip()]
+    print(f"{len(texts)} paragraph(s) from {len(args.images)} image(s)\n")
+
+    backends = [
+        ("torch", lambda: load_model(backend="torch")),
+        ("onnx fp32", lambda: load_onnx_model(model_name, False, args.threads)),
+        ("onnx int8", lambda: load_onnx_model(model_name, True, args.threads)),
+    ]
+    reference = None
+    for name, load in backends:
+        start = time.perf_counter()
+        model = load()
+        load_seconds = time.perf_counter() - start
+        latency, throughput, entities = measure(model, texts, args.batch_size)
+        if reference is None:
+            reference = entities
+        precision, recall, f1 = agreement(reference, entities)
+        print(
+            f"{name:>10}: load {load_seconds:.2f}s, {latency * 1000:.1f} ms/paragraph, "
+            f"{throughput:.1f} paragraphs/s, {len(entities)} entities, "
+            f"agreement P={precision:.3f} R={recall:.3f} F1={f1:.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
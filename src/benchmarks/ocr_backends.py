@@ -0,0 +1,49 @@
+"""
+Per-page OCR latency of the pytesseract and tesserocr backends.
+
+The first call of each backend is reported separately because tesserocr
+loads the traineddata once and reuses it for every later page.
+
+Usage (from the src directory):
+    python -m benchmarks.ocr_backends path/to/img1.png path/to/img2.png --repeat 3
+"""
+
+import argparse
+import time
+
+import cv2
+
+from ai_sensitive.ocr_backend import BACKENDS
+
+from setting import ocr_config
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("images", nargs="+", help="Sample images")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the set")
+    parser.add_argument("--languages", default="eng")
+    args = parser.parse_args()
+
+    pages = [cv2.cvtColor(cv2.imread(path), cv2.COLOR_BGR2GRAY) for path in sorted(args.images)]
+    for name, backend_class in BACKENDS.items():
+        try:
+            backend = backend_class()
+        except ImportError:
+            print(f"{name:>12}: not installed")
+            continue
+
+        start = time.perf_counter()
+        backend.image_to_data(pages[0], args.languages, ocr_config)
+        first = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for page in pages:
+                backend.image_to_data(page, args.languages, ocr_config)
+        per_page = (time.perf_counter() - start) / (args.repeat * len(pages))
+        print(f"{name:>12}: first call {first:.3f}s, then {per_page:.3f}s/page")
+
+
+if __name__ == "__main__":
+    main()
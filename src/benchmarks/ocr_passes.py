@@ -0,0 +1,60 @@
+"""
+Compare two-pass and single-pass OCR throughput on a fixed set of images.
+
+Both modes use the "kmeans" layout strategy, the only one where two passes
+still exist: the default "tesseract" strategy always OCRs once. The number
+of Tesseract runs per page is checked, so the comparison cannot silently
+turn into timing the same path twice.
+
+Usage (from the src directory):
+    python -m benchmarks.ocr_passes path/to/img1.png path/to/img2.png --repeat 3
+"""
+
+import argparse
+import time
+
+from ai_sensitive.ocr_document import OCRDocument
+
+
+class CountingOCRDocument(OCRDocument):
+    passes = 0  # Tesseract runs over all instances
+
+    def _run_tesseract(self, *args, **kwargs):
+        CountingOCRDocument.passes += 1
+        return super()._run_tesseract(*args, **kwargs)
+
+
+def run_mode(image_paths, single_pass: bool, repeat: int) -> float:
+    """OCR every image `repeat` times and return pages per second."""
+    CountingOCRDocument.passes = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for image_path in image_paths:
+            CountingOCRDocument(image_path, single_pass=single_pass, strategy="kmeans")
+    elapsed = time.perf_counter() - start
+
+    expected = (1 if single_pass else 2) * len(image_paths) * repeat
+    assert CountingOCRDocument.passes == expected, (
+        f"expected {expected} OCR passes, got {CountingOCRDocument.passes}"
+    )
+    return (len(image_paths) * repeat) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("images", nargs="+", help="Sample images to OCR")
+    parser.add_argument("--repeat", type=int, default=1, help="Passes over the set")
+    args = parser.parse_args()
+
+    images = sorted(args.images)
+    before = run_mode(images, single_pass=False, repeat=args.repeat)
+    after = run_mode(images, single_pass=True, repeat=args.repeat)
+
+    print(f"Images: {len(images)} x {args.repeat}")
+    print(f"Two-pass OCR:    {before:.3f} pages/sec")
+    print(f"Single-pass OCR: {after:.3f} pages/sec")
+    print(f"Speedup:         {after / before:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
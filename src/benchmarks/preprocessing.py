@@ -0,0 +1,114 @@
+"""
+OCR time and word recall with and without image preprocessing.
+
+The baseline is the plain grayscale path. Each preprocessing configuration
+is timed (preprocessing plus OCR), and its words are mapped back to the
+original image and compared with the baseline: a baseline word counts as
+recalled when a word with the same text overlaps its box.
+
+Usage (from the src directory):
+    python -m benchmarks.preprocessing path/to/scan1.png path/to/scan2.png --dpi 600
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from ai_sensitive.ocr_backend import get_ocr_backend
+from ai_sensitive.preprocess import preprocess
+from tools.image_buffer import ImageBuffer
+
+from setting import ocr_config
+
+CONFIGURATIONS = [
+    ("downscale",),
+    ("downscale", "crop"),
+    ("downscale", "deskew", "crop"),
+    ("downscale", "deskew", "crop", "binarize"),
+]
+
+
+def words(data):
+    """(text, box) of every non-empty word."""
+    return [
+        (text.strip().lower(), (left, top, width, height))
+        for text, left, top, width, height in zip(
+            data["text"], data["left"], data["top"], data["width"], data["height"]
+        )
+        if text.strip()
+    ]
+
+
+def overlaps(a, b) -> bool:
+    return (
+        a[0] < b[0] + b[2]
+        and b[0] < a[0] + a[2]
+        and a[1] < b[1] + b[3]
+        and b[1] < a[1] + a[3]
+    )
+
+
+def recall(reference, found) -> float:
+    if not reference:
+        return 1.0
+    by_text = {}
+    for text, box in found:
+        by_text.setdefault(text, []).append(box)
+    hits = sum(
+        any(overlaps(box, other) for other in by_text.get(text, ()))
+        for text, box in reference
+    )
+    return hits / len(reference)
+
+
+def run(gray, dpi, steps, backend, languages):
+    start = time.perf_counter()
+    prepared = preprocess(gray, dpi, steps)
+    prepared_seconds = time.perf_counter() - start
+    data = backend.image_to_data(prepared.image, languages, ocr_config)
+    data = prepared.data_to_original(data)
+    return time.perf_counter() - start, prepared_seconds, prepared.image.shape, words(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("images", nargs="+", help="Sample scans")
+    parser.add_argument("--dpi", type=float, default=None, help="Override the scan resolution")
+    parser.add_argument("--languages", default="eng")
+    args = parser.parse_args()
+
+    backend = get_ocr_backend()
+    totals = {steps: [0.0, []] for steps in [()] + CONFIGURATIONS}
+    for path in sorted(args.images):
+        buffer = ImageBuffer.open(path)
+        dpi = args.dpi or buffer.dpi
+        print(f"{path} ({buffer.width}x{buffer.height}, {dpi or 'unknown'} dpi)")
+
+        seconds, _, _, reference = run(buffer.gray, dpi, (), backend, args.languages)
+        totals[()][0] += seconds
+        print(f"  {'baseline':<34} {seconds:6.2f}s  {len(reference)} words")
+        for steps in CONFIGURATIONS:
+            seconds, prepared_seconds, shape, found = run(
+                buffer.gray, dpi, steps, backend, args.languages
+            )
+            score = recall(reference, found)
+            totals[steps][0] += seconds
+            totals[steps][1].append(score)
+            print(
+                f"  {'+'.join(steps):<34} {seconds:6.2f}s "
+                f"(preprocess {prepared_seconds:.2f}s, {shape[1]}x{shape[0]})  "
+                f"recall {score:.3f}"
+            )
+
+    print("\nTotal")
+    baseline = totals[()][0]
+    for steps, (seconds, scores) in totals.items():
+        name = "+".join(steps) or "baseline"
+        speedup = baseline / seconds if seconds else float("nan")
+        mean_recall = f"recall {np.mean(scores):.3f}" if scores else ""
+        print(f"  {name:<34} {seconds:6.2f}s  x{speedup:.2f}  {mean_recall}")
+
+
+if __name__ == "__main__":
+    main()
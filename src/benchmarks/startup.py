@@ -0,0 +1,96 @@
+"""
+Start-up latency of the GUI: time to window and time to first detection.
+
+Every run starts a fresh interpreter, so import costs are measured the way a
+user sees them. Times are counted from the moment the process is spawned.
+The heavy modules already imported when the window appears are listed,
+none of them should be needed that early.
+
+Usage (from the src directory):
+    python -m benchmarks.startup path/to/img.png --runs 5
+    python -m benchmarks.startup --offscreen  # Only time to window, no display
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = ("cv2", "matplotlib", "sklearn", "torch", "gliner", "onnxruntime")
+
+
+def child(image_path):
+    # Runs in the spawned interpreter, reports wall clock timestamps as JSON
+    import setting
+
+    setting.cache_enabled = False  # Detection must not be served from disk
+
+    from PySide6.QtWidgets import QApplication
+
+    import front_ui
+
+    app = QApplication(sys.argv)
+    window = front_ui.ImageBlocker()
+    window.show()
+    app.processEvents()  # Paint the first frame
+    result = {
+        "window": time.time(),
+        "heavy_modules": [name for name in HEAVY_MODULES if name in sys.modules],
+    }
+
+    if image_path:
+        from tools.basic_info import BasicInfo
+
+        front_ui.start_background_loading()
+        BasicInfo(image_path).ai_detector()
+        result["detection"] = time.time()
+    print("STARTUP " + json.dumps(result))
+
+
+def run_once(image_path, offscreen):
+    env = dict(os.environ)
+    if offscreen:
+        env["QT_QPA_PLATFORM"] = "offscreen"
+    command = [sys.executable, "-m", "benchmarks.startup", "--child"]
+    if image_path:
+        command.append(image_path)
+
+    spawned = time.time()
+    output = subprocess.run(
+        command, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    line = next(l for l in output.splitlines() if l.startswith("STARTUP "))
+    result = json.loads(line[len("STARTUP ") :])
+    result["window"] -= spawned
+    if "detection" in result:
+        result["detection"] -= spawned
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("image", nargs="?", help="Image for time to first detection")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes to start")
+    parser.add_argument("--offscreen", action="store_true", help="Use Qt's offscreen platform")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.image)
+        return
+
+    results = [run_once(args.image, args.offscreen) for _ in range(args.runs)]
+    window = statistics.median(r["window"] for r in results)
+    print(f"time to window:          {window:.3f}s (median of {args.runs})")
+    if args.image:
+        detection = statistics.median(r["detection"] for r in results)
+        print(f"time to first detection: {detection:.3f}s (median of {args.runs})")
+    heavy = sorted({name for r in results for name in r["heavy_modules"]})
+    print(f"heavy modules before the window: {', '.join(heavy) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
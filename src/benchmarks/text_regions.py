@@ -0,0 +1,68 @@
+"""
+OCR time and word recall when only detected text regions are OCR'd.
+
+Full-page OCR is the baseline. Region detection plus the parallel OCR of the
+crops is timed against it, and a baseline word counts as recalled when a
+word with the same text overlaps its box.
+
+Usage (from the src directory):
+    python -m benchmarks.text_regions path/to/id_card.png path/to/form.png
+"""
+
+import argparse
+import time
+
+from ai_sensitive.ocr_backend import get_ocr_backend
+from ai_sensitive.text_regions import detect_text_regions
+from ai_sensitive.tiled_ocr import ocr_regions
+from benchmarks.preprocessing import recall, words
+from tools.image_buffer import ImageBuffer
+
+from setting import ocr_config, ocr_workers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("images", nargs="+", help="Sample documents")
+    parser.add_argument("--languages", default="eng")
+    parser.add_argument("--workers", type=int, default=ocr_workers)
+    args = parser.parse_args()
+
+    backend = get_ocr_backend()
+    baseline_total = regions_total = 0.0
+    for path in sorted(args.images):
+        gray = ImageBuffer.open(path).gray
+        height, width = gray.shape[:2]
+
+        start = time.perf_counter()
+        reference = words(backend.image_to_data(gray, args.languages, ocr_config))
+        baseline = time.perf_counter() - start
+
+        start = time.perf_counter()
+        rects = detect_text_regions(gray)
+        detect_seconds = time.perf_counter() - start
+        if rects is None:
+            # Dense page, the pipeline falls back to full-page OCR
+            found, seconds, coverage = reference, baseline + detect_seconds, 1.0
+        else:
+            data = ocr_regions(gray, rects, args.languages, ocr_config, args.workers)
+            seconds = time.perf_counter() - start
+            found = words(data)
+            coverage = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in rects)
+            coverage /= float(width * height)
+
+        baseline_total += baseline
+        regions_total += seconds
+        print(
+            f"{path} ({width}x{height}): full page {baseline:6.2f}s, "
+            f"regions {seconds:6.2f}s (detect {detect_seconds:.3f}s, "
+            f"{len(rects) if rects is not None else 'fallback'} regions, "
+            f"{coverage:.0%} of the page)  recall {recall(reference, found):.3f}"
+        )
+
+    speedup = baseline_total / regions_total if regions_total else float("nan")
+    print(f"\nTotal: full page {baseline_total:.2f}s, regions {regions_total:.2f}s, x{speedup:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+OCR latency of one large scan against tile size and worker count.
+
+Usage (from the src directory):
+    python -m benchmarks.tiled_ocr path/to/large_scan.png --tiles 1024 2048 4096 --workers 1 2 4 8
+"""
+
+import argparse
+import time
+
+import cv2
+
+from ai_sensitive.ocr_backend import get_ocr_backend
+from ai_sensitive.tiled_ocr import _get_pool, tiled_image_to_data
+
+from setting import ocr_config, ocr_tile_overlap
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def word_count(data) -> int:
+    return sum(1 for text in data["text"] if text.strip())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("image", help="Large scan to OCR")
+    parser.add_argument("--tiles", type=int, nargs="+", default=[1024, 2048, 4096])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--overlap", type=int, default=ocr_tile_overlap)
+    parser.add_argument("--languages", default="eng")
+    args = parser.parse_args()
+
+    gray = cv2.cvtColor(cv2.imread(args.image), cv2.COLOR_BGR2GRAY)
+    height, width = gray.shape
+    print(f"Image: {args.image} ({width} x {height})")
+
+    backend = get_ocr_backend()
+    print(f"OCR backend: {backend.name}")
+    seconds, data = timed(backend.image_to_data, gray, args.languages, ocr_config)
+    print(f"{'untiled':>10} {'-':>8} {seconds:8.2f}s {word_count(data):7d} words")
+
+    for tile_size in args.tiles:
+        for workers in args.workers:
+            # Warm the pool first so process start-up is not part of the timing
+            if workers > 1:
+                list(_get_pool(workers).map(abs, range(workers * 4)))
+            seconds, data = timed(
+                tiled_image_to_data,
+                gray,
+                args.languages,
+                ocr_config,
+                tile_size,
+                min(args.overlap, tile_size - 1),
+                workers,
+            )
+            print(
+                f"{'tile ' + str(tile_size):>10} {str(workers) + ' wkr':>8} "
+                f"{seconds:8.2f}s {word_count(data):7d} words"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,34 +4,74 @@ import os
 from PySide6.QtWidgets import (
     QApplication,
     QMainWindow,
-    QLabel,
     QFileDialog,
     QVBoxLayout,
     QPushButton,
     QWidget,
     QHBoxLayout,
 )
-from PySide6.QtGui import QPixmap, QImage
-from PySide6.QtCore import Qt, QThread, Signal, QObject, Slot
-import cv2
+from PySide6.QtCore import Qt, QThread, QTimer, Signal, QObject, Slot
+import threading
 
 from tools.basic_info import BasicInfo
+from tools.image_view import ImageView
+from ai_sensitive.lazy_modules import warm_imports
+from ai_sensitive.sensitive_info_utils import preload_model
+import setting
 import signal
 
-class Worker(QObject):
-    finished = Signal()  # Signal to indicate the worker has finished
-    error = Signal(str)  # Signal for error handling (optional)
+class DetectionJob(QObject):
+    """OCR and detection of one image, run on a worker thread.
 
-    def __init__(self, function):
+    Widgets are never touched here, results reach the window through
+    signals, which Qt queues onto the GUI thread.
+    """
+
+    loaded = Signal(object)  # BasicInfo of the decoded image
+    ocr_done = Signal(int)  # Number of paragraphs found
+    paragraph_done = Signal(int, object)  # Paragraph index, boxes to block
+    error = Signal(str)
+    finished = Signal(bool)  # False if cancelled or failed
+
+    def __init__(self, image_path, basic_info=None):
         super().__init__()
-        self.function = function
+        self.image_path = image_path
+        self.basic_info = basic_info
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        # Takes effect at the next stage or paragraph batch, a running
+        # Tesseract call is not interrupted
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
 
+    @Slot()
     def run(self):
+        completed = False
         try:
-            self.function()
+            if self.basic_info is None:
+                self.basic_info = BasicInfo(self.image_path)
+            self.loaded.emit(self.basic_info)
+
+            if not self.cancelled:
+                ocr = self.basic_info.run_ocr()
+                self.ocr_done.emit(len(ocr.paragraphs))
+
+            if not self.cancelled:
+                for index, boxes in self.basic_info.iter_sensitive_boxes():
+                    if self.cancelled:
+                        break
+                    self.paragraph_done.emit(index, boxes)
+                else:
+                    completed = True
+                    self.basic_info.finish_report()
         except Exception as e:
-            self.error.emit(str(e))  # Emit error signal if an exception occurs
-        self.finished.emit()  # Emit finished signal when done
+            self.error.emit(str(e))
+        self.finished.emit(completed)
+
 
 class ImageBlocker(QMainWindow):
     def __init__(self):
@@ -39,15 +79,29 @@ class ImageBlocker(QMainWindow):
         self.setWindowTitle("Image Blocker")
         self.setGeometry(100, 100, 800, 600)
 
-        self.image_label = QLabel(self)
+        # Shows the original image with the boxes as a display-size overlay,
+        # the full-size redacted image is only rendered when saving
+        self.image_label = ImageView(self)
         self.image_label.setAlignment(Qt.AlignCenter)
         self.image_label.setMinimumSize(400, 300)
         self.image_path = None
         self.basic_info = None
-        self.image = None
         self.rectangles = []
         self.start_point = None
 
+        # At most one detection job runs, a click for another image while it
+        # runs cancels it and queues the new image
+        self.job = None
+        self.job_thread = None
+        self.pending_path = None
+        self.paragraph_count = 0
+
+        # Progressive results are coalesced into one redraw per interval
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(100)
+        self.refresh_timer.timeout.connect(self.refresh_view)
+
         load_button = QPushButton("Load Image")
         load_button.clicked.connect(self.load_image)
 
@@ -58,12 +112,18 @@ class ImageBlocker(QMainWindow):
         clear_button.clicked.connect(self.clear_blocks)
 
         self.ai_detector_button = QPushButton("AI Detector")
-        self.ai_detector_button.clicked.connect(lambda: self._start_worker(self.ai_detector))
+        self.ai_detector_button.clicked.connect(self.ai_detector)
+
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self.cancel_detection)
+        self.cancel_button.setEnabled(False)
+
         button_layout = QHBoxLayout()
         button_layout.addWidget(load_button)
         button_layout.addWidget(save_button)
         button_layout.addWidget(clear_button)
         button_layout.addWidget(self.ai_detector_button)
+        button_layout.addWidget(self.cancel_button)
 
         layout = QVBoxLayout()
         layout.addWidget(self.image_label)
@@ -73,95 +133,113 @@ class ImageBlocker(QMainWindow):
         container.setLayout(layout)
         self.setCentralWidget(container)
 
-    def _convert_cv2_to_qpixmap(self, cv2_image):
-        """
-        Convert an OpenCV image to QPixmap.
-        :param cv2_image: The OpenCV image to convert.
-        :return: QPixmap representation of the image.
-        """
-        # Convert BGR to RGB (OpenCV uses BGR by default)
-        cv2_image_rgb = cv2.cvtColor(cv2_image, cv2.COLOR_BGR2RGB)
-
-        # Get image dimensions
-        height, width, channel = cv2_image_rgb.shape
-
-        # Create a QImage from the RGB array
-        bytes_per_line = channel * width
-        q_image = QImage(
-            cv2_image_rgb.data, width, height, bytes_per_line, QImage.Format_RGB888
+    @Slot()
+    def ai_detector(self):
+        if not self.image_path:
+            return
+        if self.job is not None:
+            if self.job.image_path == self.image_path and not self.job.cancelled:
+                self.statusBar().showMessage("Detection already running for this image")
+            else:
+                # Replace whatever was queued, the latest image wins
+                self.job.cancel()
+                self.pending_path = self.image_path
+            return
+        self._start_job(self.image_path)
+
+    def _start_job(self, image_path):
+        # Reuse the image decoded by load_image
+        basic_info = self.basic_info
+        if basic_info is None or basic_info.img_path != image_path:
+            basic_info = None
+
+        self.job_thread = QThread()
+        self.job = DetectionJob(image_path, basic_info)
+        self.job.moveToThread(self.job_thread)
+
+        self.job_thread.started.connect(self.job.run)
+        self.job.loaded.connect(self._on_loaded)
+        self.job.ocr_done.connect(self._on_ocr_done)
+        self.job.paragraph_done.connect(self._on_paragraph_done)
+        self.job.error.connect(self._handle_error)
+        self.job.finished.connect(self._on_finished)
+        self.job.finished.connect(self.job_thread.quit)
+        self.job_thread.finished.connect(self._on_thread_finished)
+
+        self.cancel_button.setEnabled(True)
+        self.statusBar().showMessage("Loading image...")
+        self.job_thread.start()
+
+    @Slot()
+    def cancel_detection(self):
+        self.pending_path = None
+        if self.job is not None:
+            self.job.cancel()
+            self.statusBar().showMessage("Cancelling...")
+
+    def _is_current(self):
+        # Signals of a job for an image that is no longer shown are ignored
+        job = self.sender()
+        return job is self.job and job.image_path == self.image_path
+
+    @Slot(object)
+    def _on_loaded(self, basic_info):
+        if self._is_current() and self.basic_info is not basic_info:
+            self.basic_info = basic_info
+            self.image_label.set_image(basic_info.image_buffer)
+        self.statusBar().showMessage("Running OCR...")
+
+    @Slot(int)
+    def _on_ocr_done(self, paragraph_count):
+        self.paragraph_count = paragraph_count
+        self.statusBar().showMessage(f"Detecting... 0/{paragraph_count} paragraphs")
+
+    @Slot(int, object)
+    def _on_paragraph_done(self, index, boxes):
+        if not self._is_current():
+            return
+        self.statusBar().showMessage(
+            f"Detecting... {index + 1}/{self.paragraph_count} paragraphs"
         )
+        if boxes:
+            self.basic_info.regions.update(boxes)
+            if not self.refresh_timer.isActive():
+                self.refresh_timer.start()
 
-        # Convert QImage to QPixmap
-        q_pixmap = QPixmap.fromImage(q_image)
-
-        return q_pixmap
-
-    def _convert_pillow_to_qpixmap(self, pillow_image):
-        """
-        Convert a Pillow image to QPixmap.
-        :param pillow_image: The Pillow image to convert.
-        :return: QPixmap representation of the image.
-        """
-        # Convert Pillow image to RGB if not already
-        if pillow_image.mode != "RGB":
-            pillow_image = pillow_image.convert("RGB")
-
-        # Get image size and data
-        width, height = pillow_image.size
-        data = pillow_image.tobytes("raw", "RGB")
-
-        # Create a QImage from the Pillow image data
-        q_image = QImage(data, width, height, QImage.Format_RGB888)
-
-        # Convert QImage to QPixmap
-        q_pixmap = QPixmap.fromImage(q_image)
-
-        return q_pixmap
-    
-    def _start_worker(self, function):
-        self.thread = QThread()  # Create a new thread
-        self.worker = Worker(function)  # Create the worker and pass the function
-        self.worker.moveToThread(self.thread)  # Move the worker to the thread
-
-        print("Starting worker")
-        # Connect signals and slots
-        self.thread.started.connect(self.worker.run)  # Start the worker
-        self.worker.finished.connect(self.thread.quit)  # Stop the thread when done
-        self.worker.finished.connect(self.worker.deleteLater)  # Clean up the worker
-        self.thread.finished.connect(self.thread.deleteLater)  # Clean up the thread
-        self.worker.error.connect(self._handle_error)  # Handle any errors (optional)
-
-        # Start the thread
-        self.thread.start()
-    
-    def _handle_error(self, error_message):
-        print(f"Error: {error_message}")  # Handle any errors here
+    @Slot(bool)
+    def _on_finished(self, completed):
+        if self._is_current():
+            self.refresh_view()
+        self.statusBar().showMessage("Detection finished" if completed else "Detection stopped")
 
     @Slot()
-    def ai_detector(self):
-        try:
-            self.ai_detector_button.setEnabled(False)
-            if self.image_path:
-                self.basic_info = BasicInfo(self.image_path)
-                self.basic_info.ai_detector()
-                self.update_image()
-                self.display_scaled_image()
-        finally:
-            self.ai_detector_button.setEnabled(True)
+    def _on_thread_finished(self):
+        self.job.deleteLater()
+        self.job_thread.deleteLater()
+        self.job = self.job_thread = None
+        self.cancel_button.setEnabled(False)
+        if self.pending_path is not None:
+            image_path, self.pending_path = self.pending_path, None
+            if image_path == self.image_path:
+                self._start_job(image_path)
+
+    def _handle_error(self, error_message):
+        print(f"Error: {error_message}")  # Handle any errors here
+        self.statusBar().showMessage(f"Error: {error_message}")
 
     def load_image(self):
         file_path, _ = QFileDialog.getOpenFileName(
             self, "Open Image", "", "Images (*.png *.jpg *.jpeg *.bmp)"
         )
         if file_path:
+            # A running job belongs to the previous image
+            self.cancel_detection()
             self.image_path = file_path
             self.basic_info = BasicInfo(self.image_path)
-            # self.image = self._convert_pillow_to_qpixmap(self.basic_info.image_tools.image)
-            self.image = QPixmap(self.image_path)
-            self.display_scaled_image()
+            self.image_label.set_image(self.basic_info.image_buffer)
 
     def save_image(self):
-        if self.image:
+        if self.basic_info:
             save_path, _ = QFileDialog.getSaveFileName(
                 self,
                 "Save Image",
@@ -169,43 +247,41 @@ class ImageBlocker(QMainWindow):
                 "PNG Files (*.png);;JPG Files (*.jpg);;BMP Files (*.bmp)",
             )
             if save_path:
-                self.basic_info.image_tools.save_processed_image(save_path)
+                # Render the boxes into the full-size image only now
+                self.basic_info.save_processed_image(save_path)
 
     def clear_blocks(self):
-        self.basic_info.sensitive_coordinates = []
-        self.basic_info.update_block()
-        self.image = QPixmap(self.image_path)
-        self.display_scaled_image()
+        if self.basic_info:
+            self.basic_info.sensitive_coordinates = []
+            self.update_image()
 
     # def mousePressEvent(self, event):
-    #     if event.button() == Qt.LeftButton and self.image:
+    #     if event.button() == Qt.LeftButton and self.image_label.has_image():
     #         self.start_point = event.pos()
 
     # def mouseReleaseEvent(self, event):
-    #     if event.button() == Qt.LeftButton and self.image and self.start_point:
+    #     if event.button() == Qt.LeftButton and self.image_label.has_image() and self.start_point:
     #         end_point = event.pos()
     #         rect = QRect(self.start_point - self.image_label.pos(), end_point - self.image_label.pos())
     #         self.rectangles.append(rect)
     #         self.update_image()
     #         self.start_point = None
 
+    @Slot()
+    def refresh_view(self):
+        self.update_image()
+
     def update_image(self):
         if self.basic_info:
-            self.basic_info.update_block()
-            self.image = self._convert_pillow_to_qpixmap(
-                self.basic_info.image_tools.process_image
-            )
+            self.image_label.set_boxes(self.basic_info.sensitive_coordinates)
 
-    def display_scaled_image(self):
-        if self.image:
-            scaled_image = self.image.scaled(
-                self.image_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation
-            )
-            self.image_label.setPixmap(scaled_image)
-
-    def resizeEvent(self, event):
-        super().resizeEvent(event)
-        self.display_scaled_image()
+    def closeEvent(self, event):
+        # Let a running job stop before its thread is destroyed
+        self.cancel_detection()
+        if self.job_thread is not None:
+            self.job_thread.quit()
+            self.job_thread.wait()
+        super().closeEvent(event)
 
 
 def load_stylesheet():
@@ -222,8 +298,18 @@ def run():
     app.setStyleSheet(stylesheet)  # Apply the QSS
     window = ImageBlocker()
     window.show()
+    # Runs from the event loop, after the window has been painted
+    QTimer.singleShot(0, start_background_loading)
     sys.exit(app.exec())
 
 
+def start_background_loading():
+    # OpenCV is needed for the first image, the model (torch and GLiNER) for
+    # the first detection, both load while the user picks an image
+    warm_imports(["cv2"])
+    if setting.preload_model:
+        preload_model()
+
+
 if __name__ == "__main__":
     run()
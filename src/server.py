@@ -0,0 +1,339 @@
+"""
+Local HTTP redaction service.
+
+Usage:
+    python src/server.py [--host 127.0.0.1] [--port 8080] [--workers N]
+
+POST an image as the raw request body to /redact and get back JSON with the
+redacted image (base64 PNG), the detected entities and the block coordinates.
+GET /health reports the queue state.
+
+OCR runs in a process pool. NER requests of concurrent uploads are grouped
+into micro-batches for the single shared model. Requests beyond
+`server_max_pending` are rejected with 503, uploads larger than
+`server_max_upload_bytes` with 413.
+"""
+
+import argparse
+import asyncio
+import base64
+import io
+import json
+import multiprocessing
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from PIL import Image, UnidentifiedImageError
+
+from ai_sensitive.ocr_document import OCRDocument
+from ai_sensitive.sensitive_ai_detector import SensitiveAIDetector
+from ai_sensitive.sensitive_info_utils import load_model
+from tools.basic_info import BasicInfo
+from tools.image_buffer import ImageBuffer
+
+from setting import (
+    ner_batch_size,
+    server_host,
+    server_port,
+    server_ocr_workers,
+    server_max_batch,
+    server_max_wait_ms,
+    server_max_pending,
+    server_max_upload_bytes,
+)
+
+MAX_HEADER_BYTES = 16 * 1024
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class InvalidImage(Exception):
+    """The upload could not be decoded (raised in pool processes, so no
+    extra constructor arguments that would break pickling)."""
+
+
+def _decode(data: bytes) -> Image.Image:
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.load()
+    except (UnidentifiedImageError, OSError) as e:
+        raise InvalidImage(f"not a readable image: {e}")
+    return image
+
+
+def _ocr_worker(data: bytes) -> OCRDocument:
+    # Runs in a pool process, only the OCR result (no pixels) is sent back
+    buffer = ImageBuffer.from_pil(_decode(data))
+    return OCRDocument(
+        "upload", image=buffer.bgr, gray_image=buffer.gray, dpi=buffer.dpi
+    )
+
+
+def _render(data: bytes, detector: SensitiveAIDetector) -> dict:
+    # Block the entities on the uploaded image and build the response body
+    basic_info = BasicInfo("upload", image=_decode(data))
+    basic_info.ocr = detector.ocr
+    basic_info.sensitive_ai_detector = detector
+    basic_info.sensitive_info = detector.collect_sensitive_info()
+    basic_info.apply_sensitive_info()
+
+    output = io.BytesIO()
+    basic_info.image_tools.get_processed_image().save(output, format="PNG")
+    return {
+        "image": base64.b64encode(output.getvalue()).decode("ascii"),
+        "format": "png",
+        "sensitive_info": basic_info.sensitive_info,
+        "coordinates": [list(map(int, c)) for c in basic_info.sensitive_coordinates],
+    }
+
+
+class NERBatcher:
+    """Collects detectors of concurrent requests into NER micro-batches.
+
+    A batch is run as soon as `max_batch` documents are waiting, or
+    `max_wait` seconds after its first document arrived. Batches run one at
+    a time on a dedicated thread that owns the model.
+    """
+
+    def __init__(
+        self,
+        max_batch: int = server_max_batch,
+        max_wait: float = server_max_wait_ms / 1000,
+    ):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: "asyncio.Queue" = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ner")
+        self._task = None
+        self.batches = 0
+        self.documents = 0
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+        self._executor.shutdown(wait=False)
+
+    async def warm_up(self):
+        # Load the model on the NER thread before the first request needs it
+        await asyncio.get_running_loop().run_in_executor(self._executor, load_model)
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    async def detect(self, detector: SensitiveAIDetector) -> SensitiveAIDetector:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((detector, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            detectors = [detector for detector, _ in batch]
+            try:
+                await loop.run_in_executor(
+                    self._executor,
+                    SensitiveAIDetector.get_sensitive_info_batch,
+                    detectors,
+                    ner_batch_size,
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batches += 1
+            self.documents += len(batch)
+            for detector, future in batch:
+                if not future.done():
+                    future.set_result(detector)
+
+
+class RedactionServer:
+    def __init__(
+        self, ocr_workers=server_ocr_workers, max_pending: int = server_max_pending
+    ):
+        # Forked workers would inherit the sockets of open connections and keep
+        # them from closing, so workers start from a clean forkserver process
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context(
+            "forkserver" if "forkserver" in methods else "spawn"
+        )
+        self.ocr_pool = ProcessPoolExecutor(max_workers=ocr_workers, mp_context=context)
+        self.batcher = NERBatcher()
+        self.max_pending = max_pending
+        self.in_flight = 0
+        self.served = 0
+        self.rejected = 0
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            method, path, headers = await self._read_head(reader)
+            status, body = await self._dispatch(method, path, headers, reader)
+        except HTTPError as e:
+            status, body = e.status, {"error": str(e)}
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        except Exception as e:
+            print(f"Request failed: {e}")
+            status, body = 500, {"error": str(e)}
+
+        payload = json.dumps(body).encode()
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            "Connection: close\r\n"
+        )
+        if status == 503:
+            head += "Retry-After: 1\r\n"
+        try:
+            writer.write(head.encode() + b"\r\n" + payload)
+            await writer.drain()
+            writer.close()
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+    async def _read_head(self, reader: asyncio.StreamReader):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.LimitOverrunError:
+            raise HTTPError(400, "request head too large")
+        if len(head) > MAX_HEADER_BYTES:
+            raise HTTPError(400, "request head too large")
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "malformed request line")
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        return method.upper(), urlsplit(target).path, headers
+
+    async def _dispatch(self, method, path, headers, reader):
+        if path == "/health":
+            if method != "GET":
+                raise HTTPError(405, "use GET")
+            return 200, self.health()
+        if path != "/redact":
+            raise HTTPError(404, f"unknown path {path}")
+        if method != "POST":
+            raise HTTPError(405, "use POST")
+
+        try:
+            length = int(headers.get("content-length", ""))
+        except ValueError:
+            raise HTTPError(400, "Content-Length is required")
+        if length > server_max_upload_bytes:
+            raise HTTPError(413, f"upload larger than {server_max_upload_bytes} bytes")
+
+        # Backpressure: rather reject now than let the queues grow without bound
+        if self.in_flight >= self.max_pending:
+            self.rejected += 1
+            raise HTTPError(503, "server busy, retry later")
+
+        self.in_flight += 1
+        try:
+            data = await reader.readexactly(length)
+            return 200, await self.redact(data)
+        finally:
+            self.in_flight -= 1
+
+    async def redact(self, data: bytes) -> dict:
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            ocr = await loop.run_in_executor(self.ocr_pool, _ocr_worker, data)
+            ocr_done = time.perf_counter()
+            detector = await self.batcher.detect(SensitiveAIDetector(ocr))
+            ner_done = time.perf_counter()
+            body = await loop.run_in_executor(None, _render, data, detector)
+        except InvalidImage as e:
+            raise HTTPError(400, str(e))
+        self.served += 1
+        body["timings"] = {
+            "ocr_seconds": ocr_done - start,
+            "ner_seconds": ner_done - ocr_done,
+            "render_seconds": time.perf_counter() - ner_done,
+        }
+        return body
+
+    def health(self) -> dict:
+        return {
+            "status": "ok",
+            "in_flight": self.in_flight,
+            "ner_queue": self.batcher.pending(),
+            "ner_batches": self.batcher.batches,
+            "ner_documents": self.batcher.documents,
+            "served": self.served,
+            "rejected": self.rejected,
+        }
+
+    async def serve(self, host: str, port: int):
+        loop = asyncio.get_running_loop()
+        # Load the model before accepting requests, not inside the first one
+        await self.batcher.warm_up()
+        self.batcher.start()
+
+        server = await asyncio.start_server(
+            self.handle, host, port, limit=MAX_HEADER_BYTES
+        )
+        stop = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except NotImplementedError:  # Windows
+                pass
+        print(f"Serving on http://{host}:{port}")
+        async with server:
+            await stop.wait()
+        await self.batcher.stop()
+        self.ocr_pool.shutdown(cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the redaction HTTP service.")
+    parser.add_argument("--host", default=server_host)
+    parser.add_argument("--port", type=int, default=server_port)
+    parser.add_argument(
+        "--workers", type=int, default=server_ocr_workers, help="OCR worker processes"
+    )
+    args = parser.parse_args()
+    asyncio.run(RedactionServer(args.workers).serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
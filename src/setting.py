@@ -1,6 +1,47 @@
+import os
+
 ocr_config = ""  # Default (Suggested)
 # ocr_config = r'--psm 4' (Alternative)
 
+# Run Tesseract once per image and reuse the word table for threshold fitting
+# and grouping. Set to False to restore the original two-pass behaviour.
+single_pass_ocr = True
+
+# OCR engine: "tesserocr" keeps Tesseract loaded in-process (pip install tesserocr),
+# "pytesseract" starts the tesseract executable per call, "auto" prefers tesserocr
+ocr_backend = "auto"
+
+# Tiled OCR for very large scans: pages whose longer side exceeds ocr_tile_size
+# pixels are split into overlapping tiles OCR'd in parallel. None disables it.
+# The overlap should be wider than the widest word.
+ocr_tile_size = None  # e.g. 2048
+ocr_tile_overlap = 200
+ocr_workers = None  # Worker processes, None uses every core (in-process inside batch/server workers)
+
+# Resolution used to render PDF pages (requires pypdfium2)
+pdf_render_dpi = 300
+
+# Image preprocessing before OCR, any of "downscale" (scans above
+# ocr_target_dpi), "deskew", "crop" (blank margins) and "binarize" (adaptive
+# threshold). Boxes are mapped back to the original image for redaction
+preprocess_steps = ("downscale", "crop")
+ocr_target_dpi = 300
+preprocess_max_skew = 5.0  # Largest rotation in degrees deskew looks for
+binarize_block_size = 31  # Neighbourhood of the adaptive threshold, in pixels
+binarize_offset = 15  # Subtracted from the local mean
+
+# Only OCR the regions that look like text (found with OpenCV, no model).
+# Much faster on forms and ID cards that are mostly photos, logos and blank
+# space; pages where text covers more than text_regions_max_coverage are
+# OCR'd whole
+text_regions_enabled = False
+text_regions_max_coverage = 0.6
+
+# How OCR words are grouped into lines and paragraphs:
+#   "tesseract" - use Tesseract's own block/paragraph/line ids (fast, no clustering)
+#   "kmeans"    - fit line/paragraph spacing thresholds with KMeans (needs scikit-learn)
+layout_strategy = "tesseract"
+
 # Labels for entity prediction
 # Most GLiNER models should work best when entity types are in lower case or title case
 sensitive_labels = [
@@ -33,4 +74,63 @@ sensitive_labels = [
     "Intellectual Property",
 ]
 
+# NER model, loaded once per process and shared by every detection
+model_name = "urchade/gliner_mediumv2.1"
+model_device = "cpu"  # e.g. "cuda" when a GPU is available
+preload_model = True  # Load and warm up the model in the background at start-up
+ner_batch_size = 8  # Paragraphs per NER forward pass
+# Long paragraphs are split into overlapping windows of at most this many
+# words as GLiNER counts them (every punctuation mark is a word), capped at the
+# model's max_len, so nothing falls outside the model's window. Smaller chunks
+# batch better, more overlap catches more entities cut at a boundary
+ner_chunk_size = 200
+ner_chunk_overlap = 30
+# Entities scoring below ner_threshold are not redacted. Every candidate down
+# to ner_score_floor is kept with the document, so the threshold and the label
+# set can be changed without running the model again
+ner_threshold = 0.3
+ner_score_floor = 0.1
+
+# Inference backend: "torch" runs the PyTorch model, "onnx" exports it once to
+# ONNX (cached on disk) and runs it with onnxruntime on the CPU
+ner_backend = "torch"
+onnx_quantize = True  # Dynamic int8 quantization of the exported model
+# Kept outside cache_dir, so clearing or evicting the result cache never
+# touches the exported models
+onnx_dir = os.path.join(os.path.expanduser("~"), ".cache", "privacyshield-onnx")
+onnx_threads = None  # onnxruntime intra-op threads, None lets onnxruntime decide
+
+# Regex/checksum detectors for structured PII (emails, IPs, cards, SSNs,
+# phone numbers, dated birth/issue dates) run before the NER model
+rule_detectors_enabled = True
+# Leave labels the rules fully cover out of the NER label set
+rule_labels_skip_ner = True
+
+# How redaction boxes are rendered: "fill" (solid black), "blur" or "pixelate"
+redaction_style = "fill"
+redaction_blur_kernel = 31  # Gaussian kernel size for "blur"
+redaction_pixel_size = 12  # Block size in pixels for "pixelate"
+
+# On-disk cache of OCR word tables and NER entities, keyed by content hash.
+# Off by default: entries are plaintext JSON holding the document text and the
+# detected PII (every NER candidate down to ner_score_floor)
+cache_enabled = False
+cache_dir = os.path.join(os.path.expanduser("~"), ".cache", "privacyshield")
+cache_max_bytes = 512 * 1024 * 1024  # Least recently used entries are evicted past this
+
+# HTTP redaction service (src/server.py)
+server_host = "127.0.0.1"
+server_port = 8080
+server_ocr_workers = None  # OCR processes, None uses every core
+server_max_batch = 16  # Documents per NER micro-batch
+server_max_wait_ms = 20  # How long a micro-batch waits for more documents
+server_max_pending = 64  # Requests in progress before new ones get 503
+server_max_upload_bytes = 32 * 1024 * 1024  # Larger uploads get 413
+
+# Per-document pipeline reports (stage timings, counts, peak memory).
+# Set a path to append every report as a JSON line and/or to write a
+# Chrome trace ("{document}" in the path is replaced by the file name)
+profile_jsonl_path = None
+profile_trace_path = None
+
 debug_flag = False # For development purposes
\ No newline at end of file
@@ -1,34 +1,152 @@
 from ai_sensitive.ocr_document import OCRDocument
+from ai_sensitive.pipeline_report import PipelineReport
 from ai_sensitive.sensitive_ai_detector import SensitiveAIDetector
+from tools.image_buffer import ImageBuffer
 from tools.image_tools import ImageTools
-from typing import List, Tuple
+from tools.region_store import RegionStore
+from typing import Iterator, List, Tuple
+
+from PIL import Image
+
+from setting import debug_flag, ner_batch_size, profile_jsonl_path, profile_trace_path
 
 
 class BasicInfo:
-    def __init__(self, img_path):
+    def __init__(self, img_path, image: Image.Image = None):
         self.img_path: str = img_path
+        # Stage timings and counts of everything done for this document
+        self.report = PipelineReport(img_path)
 
-        self.image_tools = ImageTools(self.img_path)
+        # Decode once (or adopt an already decoded page), OCR, redaction and
+        # the UI all work on views of this buffer
+        with self.report.stage("image_load"):
+            self.image_buffer = (
+                ImageBuffer.from_pil(image) if image is not None else ImageBuffer.open(img_path)
+            )
+            self.image_tools = ImageTools(buffer=self.image_buffer)
         self.ocr: OCRDocument = None
         self.sensitive_ai_detector: SensitiveAIDetector = None
 
-        self.sensitive_info: List[str] = []
-        self.sensitive_coordinates: List[Tuple[int, int, int, int]] = (
-            []
-        )  # (x, y, width, height)
+        self.sensitive_info: List[dict] = []  # Entities with label and offsets
+        self.regions = RegionStore()  # (x, y, width, height) boxes to block
+        # Boxes placed by detection, detected boxes removed by hand and the
+        # (box, merge) additions made by hand, so re-detection can replace
+        # the detected boxes and redo the manual edits on top
+        self.ai_boxes: List[Tuple[int, int, int, int]] = []
+        self.removed_boxes = set()
+        self.manual_boxes: List[Tuple[Tuple[int, int, int, int], bool]] = []
+
+    def run_ocr(self) -> OCRDocument:
+        with self.report.activate():
+            self.ocr = OCRDocument(
+                self.img_path,
+                image=self.image_buffer.bgr,
+                gray_image=self.image_buffer.gray,
+                dpi=self.image_buffer.dpi,
+            )
+        return self.ocr
 
     def ai_detector(self):
-        self.ocr = OCRDocument(self.img_path)
-        self.sensitive_ai_detector = SensitiveAIDetector(self.ocr)
-        self.sensitive_info = self.sensitive_ai_detector.get_sensitive_info()
-        self.sensitive_coordinates.extend(
-            self.sensitive_ai_detector.process(self.sensitive_info)
-        )
-        self.update_block()
+        with self.report.activate():
+            self.run_ocr()
+            self.sensitive_ai_detector = SensitiveAIDetector(self.ocr)
+            self.removed_boxes = set()
+            self.sensitive_info = self.sensitive_ai_detector.get_sensitive_info()
+            self.apply_sensitive_info()
+        self.finish_report()
+
+    def finish_report(self) -> PipelineReport:
+        """Print and export the report as configured in setting.py."""
+        if debug_flag:
+            print(self.report.summary())
+        if profile_jsonl_path:
+            self.report.write_jsonl(profile_jsonl_path)
+        if profile_trace_path:
+            self.report.write_chrome_trace(profile_trace_path)
+        return self.report
+
+    def iter_sensitive_boxes(
+        self, batch_size: int = ner_batch_size
+    ) -> Iterator[Tuple[int, List[Tuple[int, int, int, int]]]]:
+        """Detect paragraph by paragraph, yielding (paragraph index, boxes).
+
+        Runs OCR first unless `run_ocr` was already called. The boxes are not
+        added to `regions`, so the caller decides when to apply them.
+        """
+        if self.ocr is None:
+            self.run_ocr()
+        detector = SensitiveAIDetector(self.ocr)
+        self.sensitive_ai_detector = detector
+        self.ai_boxes = []
+        self.removed_boxes = set()
+        # Stages are recorded into this document's report, the context is
+        # re-entered around each step since the caller runs between yields
+        entries = detector.iter_sensitive_info(batch_size)
+        while True:
+            with self.report.activate():
+                try:
+                    index, entities = next(entries)
+                except StopIteration:
+                    break
+                with self.report.stage("back_location"):
+                    paragraph = self.ocr.paragraphs[index]
+                    boxes = detector.back_locate_sensitive_info([paragraph], [entities])
+            self.ai_boxes.extend(boxes)
+            yield index, boxes
+        self.sensitive_info = detector.collect_sensitive_info()
+        self.report.count("entities", len(self.sensitive_info))
+
+    def apply_sensitive_info(self):
+        # Locate the detected entities and block them on the image
+        with self.report.activate():
+            self.ai_boxes = self.sensitive_ai_detector.process()
+            self.regions.update(b for b in self.ai_boxes if b not in self.removed_boxes)
+            # Boxes added by hand go on top, merges are redone with the new boxes
+            for box, merge in self.manual_boxes:
+                self.regions.add(box, merge)
+            self.update_block()
+        self.report.count("entities", len(self.sensitive_info))
+        self.report.count("boxes", len(self.regions))
+
+    def redetect(self, labels: List[str] = None, threshold: float = None):
+        """Update the boxes for another label set or threshold.
+
+        Stored NER scores are filtered again, only labels never computed for
+        this document go through the model. Boxes added or removed by hand
+        stay as they are.
+        """
+        if self.sensitive_ai_detector is None:
+            raise Exception("Please run ai_detector first.")
+        with self.report.activate():
+            self.sensitive_info = self.sensitive_ai_detector.get_sensitive_info(
+                labels=labels, threshold=threshold
+            )
+        self.regions.clear()
+        self.apply_sensitive_info()
+
+    @property
+    def sensitive_coordinates(self) -> List[Tuple[int, int, int, int]]:
+        return list(self.regions)
+
+    @sensitive_coordinates.setter
+    def sensitive_coordinates(self, coordinates: List[Tuple[int, int, int, int]]):
+        # Replaces detected and manual boxes alike, the new ones count as manual
+        self.regions.clear()
+        self.regions.update(coordinates)
+        self.manual_boxes = [(box, False) for box in self.regions]
+        self.ai_boxes = []
+        self.removed_boxes = set()
 
     def update_block(self):
-        self.image_tools.draw_block(self.sensitive_coordinates)
-        
+        with self.report.stage("rendering"):
+            self.image_tools.draw_block(self.regions)
+
+    def save_processed_image(self, path: str):
+        # Renders any pending box changes before writing the file
+        self.update_block()
+        with self.report.stage("save"):
+            self.image_tools.save_processed_image(path)
+
     def plot_ocr(self):
         if self.ocr is None:
             raise Exception("Please run ai_detector first, or set ocr manually.")
@@ -38,14 +156,31 @@ class BasicInfo:
         self.image_tools.show_processed_image()
 
     def add_sensitive_coordinates(
-        self, coordinates: List[int]
+        self, coordinates: List[int], merge: bool = False
     ):  # (x, y, width, height)
-        self.sensitive_coordinates.append(coordinates)
+        # Duplicates are ignored, with merge overlapping boxes are combined
+        box = self.regions.add(coordinates, merge)
+        self.manual_boxes.append((tuple(int(v) for v in coordinates), merge))
+        return box
 
     def remove_sensitive_coordinates(self, point: List[int]):  # (x, y)
-        for coordinate in self.sensitive_coordinates:
-            if point[0] in range(
-                coordinate[0], coordinate[0] + coordinate[2]
-            ) and point[1] in range(coordinate[1], coordinate[1] + coordinate[3]):
-                self.sensitive_coordinates.remove(coordinate)
+        # Removes every box under the point
+        removed = self.regions.remove_at(point[0], point[1])
+        for box in removed:
+            # A merged box may hold several detected and manual boxes
+            self.removed_boxes.update(b for b in self.ai_boxes if _inside(b, box))
+            self.manual_boxes = [
+                (b, merge) for b, merge in self.manual_boxes if not _inside(b, box)
+            ]
+        return removed
+
+
+def _inside(inner, outer) -> bool:
+    # Both (x, y, width, height)
+    return (
+        outer[0] <= inner[0]
+        and outer[1] <= inner[1]
+        and inner[0] + inner[2] <= outer[0] + outer[2]
+        and inner[1] + inner[3] <= outer[1] + outer[3]
+    )
 
@@ -0,0 +1,149 @@
+import importlib
+import os
+from typing import Iterator, List
+
+from PIL import Image, TiffImagePlugin
+
+from setting import pdf_render_dpi
+
+MULTI_FRAME_EXTENSIONS = (".tif", ".tiff")
+PDF_EXTENSIONS = (".pdf",)
+
+
+def _import_pdfium():
+    # PDF rendering is optional, only needed when a PDF is opened
+    try:
+        return importlib.import_module("pypdfium2")
+    except ImportError as e:
+        raise ImportError(
+            "Reading PDF files requires pypdfium2 (pip install pypdfium2)"
+        ) from e
+
+
+class DocumentSource:
+    """Lazily decodes the pages of an image, multi-frame TIFF or PDF.
+
+    Pages are produced one at a time by `pages()`, so only the current page
+    is held in memory.
+    """
+
+    def __init__(self, path: str, dpi: int = pdf_render_dpi):
+        self.path = path
+        self.dpi = dpi
+        self.extension = os.path.splitext(path)[1].lower()
+
+    @property
+    def is_pdf(self) -> bool:
+        return self.extension in PDF_EXTENSIONS
+
+    def page_count(self) -> int:
+        if self.is_pdf:
+            pdf = _import_pdfium().PdfDocument(self.path)
+            try:
+                return len(pdf)
+            finally:
+                pdf.close()
+        with Image.open(self.path) as image:
+            return getattr(image, "n_frames", 1)
+
+    def pages(self) -> Iterator[Image.Image]:
+        """Yield every page as an RGB PIL image."""
+        if self.is_pdf:
+            yield from self._pdf_pages()
+        else:
+            yield from self._image_pages()
+
+    def _image_pages(self) -> Iterator[Image.Image]:
+        with Image.open(self.path) as image:
+            for index in range(getattr(image, "n_frames", 1)):
+                image.seek(index)  # Frames are decoded on demand
+                yield image.convert("RGB")
+
+    def _pdf_pages(self) -> Iterator[Image.Image]:
+        pdf = _import_pdfium().PdfDocument(self.path)
+        try:
+            for index in range(len(pdf)):
+                page = pdf[index]
+                try:
+                    bitmap = page.render(scale=self.dpi / 72)
+                    image = bitmap.to_pil().convert("RGB")
+                    image.info["dpi"] = (self.dpi, self.dpi)
+                    yield image
+                finally:
+                    page.close()
+        finally:
+            pdf.close()
+
+
+class PageWriter:
+    """Writes redacted pages to disk as they are produced.
+
+    PDF and TIFF outputs grow page by page in a single file. Other formats
+    have no multi-page support, so extra pages go to `<name>_p<N>.<ext>`.
+    """
+
+    def __init__(self, path: str, dpi: int = pdf_render_dpi):
+        self.path = path
+        self.dpi = dpi
+        self.extension = os.path.splitext(path)[1].lower()
+        self.paths: List[str] = []  # Files written so far
+        self.page_count = 0
+        self._tiff = None
+
+    def write(self, image: Image.Image):
+        if self.extension in PDF_EXTENSIONS:
+            # Later pages are appended to the existing file
+            image.save(
+                self.path, "PDF", resolution=self.dpi, append=self.page_count > 0
+            )
+            if not self.paths:
+                self.paths.append(self.path)
+        elif self.extension in MULTI_FRAME_EXTENSIONS:
+            if self._tiff is None:
+                self._tiff = TiffImagePlugin.AppendingTiffWriter(self.path, True)
+                self.paths.append(self.path)
+            image.save(self._tiff, "TIFF")
+            self._tiff.newFrame()
+        else:
+            path = self.path
+            if self.page_count > 0:
+                stem, ext = os.path.splitext(self.path)
+                path = f"{stem}_p{self.page_count + 1}{ext}"
+            image.save(path)
+            self.paths.append(path)
+        self.page_count += 1
+
+    def close(self):
+        if self._tiff is not None:
+            self._tiff.close()
+            self._tiff = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def redact_document(path: str, output_path: str) -> List[dict]:
+    """Detect and block sensitive information page by page.
+
+    Each page is decoded, OCR'd, run through the detector, redacted and
+    written before the next one is read. Returns per-page results.
+    """
+    from tools.basic_info import BasicInfo
+
+    results = []
+    with PageWriter(output_path) as writer:
+        for index, page in enumerate(DocumentSource(path).pages()):
+            basic_info = BasicInfo(path, image=page)
+            basic_info.ai_detector()
+            writer.write(basic_info.image_tools.get_processed_image())
+            results.append(
+                {
+                    "page": index + 1,
+                    "sensitive_info": basic_info.sensitive_info,
+                    "coordinates": [list(map(int, c)) for c in basic_info.sensitive_coordinates],
+                }
+            )
+    return results
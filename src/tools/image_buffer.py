@@ -0,0 +1,115 @@
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+from ai_sensitive.lazy_modules import lazy_module
+
+cv2 = lazy_module("cv2")  # Loaded with the first image, not at start-up
+
+
+class ImageBuffer:
+    """A decoded image shared by OpenCV, PIL and Qt without extra copies.
+
+    Pixels are stored once as an H x W x 4 RGBX array. The 4th byte makes the
+    layout match PIL's and Qt's internal 32-bit RGB formats, so both can wrap
+    the same memory: `pil()` and `qimage()` are views, and `bgr` is a strided
+    NumPy view for OpenCV. Only the grayscale copy used for OCR is extra.
+    """
+
+    def __init__(self, rgbx: np.ndarray, dpi: Optional[float] = None):
+        if rgbx.ndim != 3 or rgbx.shape[2] != 4 or rgbx.dtype != np.uint8:
+            raise ValueError("ImageBuffer expects an H x W x 4 uint8 array")
+        self.rgbx = np.ascontiguousarray(rgbx)
+        self.dpi = dpi  # Horizontal resolution from the file, if it has one
+        self._gray: Optional[np.ndarray] = None
+
+    @classmethod
+    def open(cls, path: str) -> "ImageBuffer":
+        """Decode an image file once."""
+        bgr = cv2.imread(path, cv2.IMREAD_COLOR)
+        if bgr is None:
+            # Formats OpenCV cannot read go through PIL instead
+            with Image.open(path) as image:
+                return cls.from_pil(image)
+        return cls(cv2.cvtColor(bgr, cv2.COLOR_BGR2RGBA), _file_dpi(path))
+
+    @classmethod
+    def from_pil(cls, image: Image.Image) -> "ImageBuffer":
+        return cls(np.asarray(image.convert("RGBX")), _image_dpi(image))
+
+    @property
+    def width(self) -> int:
+        return self.rgbx.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.rgbx.shape[0]
+
+    @property
+    def size(self):
+        return self.width, self.height
+
+    @property
+    def nbytes(self) -> int:
+        extra = self._gray.nbytes if self._gray is not None else 0
+        return self.rgbx.nbytes + extra
+
+    @property
+    def rgb(self) -> np.ndarray:
+        """H x W x 3 RGB view."""
+        return self.rgbx[:, :, :3]
+
+    @property
+    def bgr(self) -> np.ndarray:
+        """H x W x 3 BGR view for OpenCV (not contiguous, copy before drawing)."""
+        return self.rgbx[:, :, 2::-1]
+
+    @property
+    def gray(self) -> np.ndarray:
+        """Grayscale copy, computed once on first use."""
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.rgbx, cv2.COLOR_RGBA2GRAY)
+        return self._gray
+
+    def pil(self) -> Image.Image:
+        """Read-only PIL image over the same memory."""
+        return Image.frombuffer("RGB", self.size, self.rgbx, "raw", "RGBX", 0, 1)
+
+    def to_pil(self) -> Image.Image:
+        """Independent RGB PIL image, for saving in any format."""
+        return self.pil().convert("RGB")
+
+    def qimage(self):
+        """QImage over the same memory, valid while this buffer is alive."""
+        from PySide6.QtGui import QImage
+
+        image = QImage(
+            self.rgbx.data,
+            self.width,
+            self.height,
+            self.rgbx.strides[0],
+            QImage.Format_RGBX8888,
+        )
+        image._buffer = self  # Keep the pixels alive as long as the QImage
+        return image
+
+    def copy(self) -> "ImageBuffer":
+        return ImageBuffer(self.rgbx.copy(), self.dpi)
+
+
+def _file_dpi(path: str) -> Optional[float]:
+    # PIL only parses the header here, the pixels already came from OpenCV
+    try:
+        with Image.open(path) as image:
+            return _image_dpi(image)
+    except OSError:
+        return None
+
+
+def _image_dpi(image: Image.Image) -> Optional[float]:
+    # Files without resolution info report nothing (or a meaningless 1 or 72)
+    dpi = image.info.get("dpi")
+    if not dpi or float(dpi[0]) <= 72:
+        return None
+    return float(dpi[0])
@@ -1,35 +1,45 @@
 from PIL import Image
 
+from tools.image_buffer import ImageBuffer
+from tools.redaction_compositor import RedactionCompositor
+
 class ImageTools:
-    def __init__(self, image_path):
-        self.image = Image.open(image_path)
-        self.process_image = self.image.copy()
+    def __init__(self, image_path=None, image: Image.Image = None, buffer: ImageBuffer = None):
+        # An already decoded image (e.g. one page of a PDF) or a shared buffer
+        # can be passed instead of a path
+        if buffer is None:
+            buffer = ImageBuffer.from_pil(image) if image is not None else ImageBuffer.open(image_path)
+        self.buffer = buffer
+        self.image = buffer.pil()  # Views over the shared pixels, no copies
+        self.process_buffer = buffer.copy()
+        self.process_image = self.process_buffer.pil()
+        self.compositor = RedactionCompositor(self.buffer, self.process_buffer)
 
     # def draw_rectangle(self, coordinates, outline="red", width=2):
     #     for coord in coordinates:
     #         self.process_image.rectangle(coord, outline=outline, width=width)
 
     def fill_rectangle(self, coordinates, fill="black"):
-        for coord in coordinates:
-            x, y, w, h = coord
-            fill_color = Image.new("RGB", (w, h), fill)
-            self.process_image.paste(fill_color, (x, y, x + w, y + h))
+        # Add boxes on top of the current ones
+        self.compositor.fill = fill
+        return self.compositor.add(coordinates)
 
     def draw_block(self, coordinates):
-        self.process_image = self.image.copy()
-        self.fill_rectangle(coordinates)
+        # Only the regions whose boxes changed are re-rendered
+        return self.compositor.set_boxes(coordinates)
 
     def get_processed_image(self):
-        return self.process_image
+        # RGB copy, independent from the buffer and savable in any format
+        return self.process_buffer.to_pil()
 
     def show_processed_image(self):
-        self.process_image.show()
+        self.get_processed_image().show()
 
     def save_processed_image(self, path):
-        self.process_image.save(path.split(".")[0] + "_processed." + path.split(".")[1])
+        self.get_processed_image().save(path.split(".")[0] + "_processed." + path.split(".")[1])
 
     def save_image(self, path):
-        self.image.save(path)
+        self.buffer.to_pil().save(path)
 
     def show_image(self):
-        self.image.show()
+        self.buffer.to_pil().show()
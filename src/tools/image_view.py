@@ -0,0 +1,157 @@
+from typing import List, Optional, Tuple
+
+from PySide6.QtCore import QRect, QSize, Qt, QTimer
+from PySide6.QtGui import QColor, QImage, QPainter, QPixmap
+from PySide6.QtWidgets import QLabel
+
+from tools.image_buffer import ImageBuffer
+
+from setting import redaction_style, redaction_blur_kernel, redaction_pixel_size
+
+MIN_LEVEL_SIZE = 256  # Smallest pyramid level, in pixels on the long side
+SMOOTH_DELAY_MS = 120  # Quiet time after the last resize before a smooth rescale
+
+
+class ImageView(QLabel):
+    """Shows an ImageBuffer scaled to fit, with redaction boxes on top.
+
+    The image is kept as a pyramid of halved copies, so a smooth rescale
+    always starts from the smallest level that is still larger than the
+    viewport. During a live resize a fast nearest-neighbour preview is drawn
+    and the smooth rescale runs once the size settles. Boxes are composited
+    on the display-sized pixmap, the full-resolution image is not touched.
+    """
+
+    def __init__(self, parent=None, style: str = redaction_style):
+        super().__init__(parent)
+        self.style = style
+        self._buffer: Optional[ImageBuffer] = None  # Keeps level 0's memory alive
+        self._levels: List[QImage] = []  # Level i is 1 / 2**i of the full size
+        self._boxes: List[Tuple[int, int, int, int]] = []
+
+        self._scaled: Optional[QPixmap] = None  # Smoothly scaled image, no boxes
+        self._display: Optional[QPixmap] = None  # _scaled with the boxes drawn
+
+        self._smooth_timer = QTimer(self)
+        self._smooth_timer.setSingleShot(True)
+        self._smooth_timer.setInterval(SMOOTH_DELAY_MS)
+        self._smooth_timer.timeout.connect(self._rescale)
+
+    def set_image(self, buffer: Optional[ImageBuffer]):
+        self._buffer = buffer
+        self._levels = [buffer.qimage()] if buffer is not None else []
+        self._boxes = []
+        self._scaled = self._display = None
+        self._rescale()
+
+    def set_boxes(self, boxes: List[Tuple[int, int, int, int]]):
+        """Replace the (x, y, width, height) boxes in full image coordinates."""
+        self._boxes = list(boxes)
+        self._display = None
+        self.update()
+
+    def has_image(self) -> bool:
+        return bool(self._levels)
+
+    def _target_rect(self) -> QRect:
+        # Largest rectangle with the image's aspect ratio inside the contents
+        contents = self.contentsRect()
+        size = self._levels[0].size().scaled(contents.size(), Qt.KeepAspectRatio)
+        x = contents.x() + (contents.width() - size.width()) // 2
+        y = contents.y() + (contents.height() - size.height()) // 2
+        return QRect(x, y, max(size.width(), 1), max(size.height(), 1))
+
+    def _level_for(self, size: QSize) -> QImage:
+        """Smallest pyramid level at least as large as `size`, built on demand."""
+        index = 0
+        while True:
+            level = self._levels[index]
+            half = QSize(level.width() // 2, level.height() // 2)
+            if (
+                half.width() < size.width()
+                or half.height() < size.height()
+                or max(half.width(), half.height()) < MIN_LEVEL_SIZE
+            ):
+                return level
+            index += 1
+            if index == len(self._levels):
+                self._levels.append(
+                    level.scaled(half, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+                )
+
+    def _rescale(self):
+        if not self._levels:
+            self._scaled = self._display = None
+            self.update()
+            return
+        size = self._target_rect().size()
+        if self._scaled is None or self._scaled.size() != size:
+            level = self._level_for(size)
+            self._scaled = QPixmap.fromImage(
+                level.scaled(size, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+            )
+            self._display = None
+        self.update()
+
+    def _composite(self):
+        # Boxes are drawn on a copy of the scaled image at display resolution
+        display = self._scaled.copy()
+        painter = QPainter(display)
+        self._paint_boxes(painter, display, self._scaled.width() / self._levels[0].width())
+        painter.end()
+        self._display = display
+
+    def _paint_boxes(self, painter: QPainter, source: Optional[QPixmap], scale: float):
+        # Without a source pixmap (live preview) every style is drawn as fill
+        for x, y, w, h in self._boxes:
+            rect = QRect(
+                int(x * scale),
+                int(y * scale),
+                max(int(round(w * scale)), 1),
+                max(int(round(h * scale)), 1),
+            )
+            if source is None or self.style == "fill":
+                painter.fillRect(rect, QColor("black"))
+                continue
+
+            region = source.copy(rect)
+            if region.isNull():
+                continue
+            # Pixelate: shrink by the block size. Blur: shrink by the kernel
+            # size and scale back up smoothly, a cheap stand-in for a Gaussian
+            step = redaction_pixel_size if self.style == "pixelate" else redaction_blur_kernel
+            step = max(step * scale, 1.0)
+            small = region.scaled(
+                max(int(rect.width() / step), 1),
+                max(int(rect.height() / step), 1),
+                Qt.IgnoreAspectRatio,
+                Qt.SmoothTransformation,
+            )
+            mode = Qt.FastTransformation if self.style == "pixelate" else Qt.SmoothTransformation
+            painter.drawPixmap(
+                rect.topLeft(),
+                small.scaled(rect.size(), Qt.IgnoreAspectRatio, mode),
+            )
+
+    def paintEvent(self, event):
+        super().paintEvent(event)  # Frame and background from the stylesheet
+        if not self._levels:
+            return
+
+        target = self._target_rect()
+        painter = QPainter(self)
+        if self._scaled is not None and self._scaled.size() == target.size():
+            if self._display is None:
+                self._composite()
+            painter.drawPixmap(target.topLeft(), self._display)
+        else:
+            # Live resize: cheap preview from the nearest pyramid level
+            painter.drawImage(target, self._level_for(target.size()))
+            painter.translate(target.topLeft())
+            self._paint_boxes(painter, None, target.width() / self._levels[0].width())
+        painter.end()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self._levels:
+            self._smooth_timer.start()  # Restarted by every resize event
@@ -0,0 +1,241 @@
+from typing import Iterable, List, Tuple
+
+import numpy as np
+from PIL import ImageColor
+
+from ai_sensitive.lazy_modules import lazy_module
+from tools.image_buffer import ImageBuffer
+
+from setting import redaction_style, redaction_blur_kernel, redaction_pixel_size
+
+cv2 = lazy_module("cv2")  # Only the blur and pixelate styles need OpenCV
+
+REDACTION_STYLES = ("fill", "blur", "pixelate")
+FULL_RENDER_CHANGES = 256  # Above this many changed boxes, re-render everything
+
+Box = Tuple[int, int, int, int]  # (x, y, width, height)
+Rect = Tuple[int, int, int, int]  # (x0, y0, x1, y1)
+
+
+def merge_boxes(rects: np.ndarray) -> List[Tuple[Rect, np.ndarray]]:
+    """Group overlapping rectangles.
+
+    `rects` is an N x 4 array of (x0, y0, x1, y1). Returns disjoint group
+    rectangles with the indices of the input rects inside each group.
+    """
+    members = [np.array([i]) for i in range(len(rects))]
+    current = np.asarray(rects, dtype=np.int64).reshape(-1, 4)
+    while True:
+        labels = _overlap_components(current)
+        count = labels.max() + 1 if len(labels) else 0
+        if count == len(current):
+            break
+        # Bounding rects of the merged groups may overlap again, so repeat
+        order = np.argsort(labels, kind="stable")
+        starts = np.searchsorted(labels[order], np.arange(count))
+        ordered = current[order]
+        current = np.stack(
+            [
+                np.minimum.reduceat(ordered[:, 0], starts),
+                np.minimum.reduceat(ordered[:, 1], starts),
+                np.maximum.reduceat(ordered[:, 2], starts),
+                np.maximum.reduceat(ordered[:, 3], starts),
+            ],
+            axis=1,
+        )
+        grouped = [[] for _ in range(count)]
+        for index, label in enumerate(labels):
+            grouped[label].append(members[index])
+        members = [np.concatenate(group) for group in grouped]
+    return [(tuple(int(v) for v in rect), group) for rect, group in zip(current, members)]
+
+
+def _overlap_components(rects: np.ndarray) -> np.ndarray:
+    """Connected components of overlapping rects, labelled 0..k-1 in first-seen order."""
+    parent = list(range(len(rects)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # Sweep on x0, only rects still open on the x axis can overlap the next one
+    boxes = rects.tolist()
+    active = []
+    for i in np.argsort(rects[:, 0], kind="stable").tolist():
+        x0, y0, x1, y1 = boxes[i]
+        active = [j for j in active if boxes[j][2] > x0]
+        for j in active:
+            if boxes[j][1] < y1 and y0 < boxes[j][3]:
+                parent[find(i)] = find(j)
+        active.append(i)
+
+    roots = [find(i) for i in range(len(rects))]
+    ids = {}
+    return np.array([ids.setdefault(root, len(ids)) for root in roots], dtype=np.int64)
+
+
+def box_mask(rects: np.ndarray, region: Rect) -> np.ndarray:
+    """Boolean mask of the union of `rects` inside `region`, built without a loop.
+
+    Uses a 2-D difference array: +1/-1 at the rectangle corners, then a
+    cumulative sum along both axes.
+    """
+    x0, y0, x1, y1 = region
+    height, width = y1 - y0, x1 - x0
+    clipped = np.clip(rects - [x0, y0, x0, y0], 0, [width, height, width, height])
+    diff = np.zeros((height + 1, width + 1), dtype=np.int32)
+    np.add.at(diff, (clipped[:, 1], clipped[:, 0]), 1)
+    np.add.at(diff, (clipped[:, 1], clipped[:, 2]), -1)
+    np.add.at(diff, (clipped[:, 3], clipped[:, 0]), -1)
+    np.add.at(diff, (clipped[:, 3], clipped[:, 2]), 1)
+    return diff.cumsum(axis=0).cumsum(axis=1)[:height, :width] > 0
+
+
+class RedactionCompositor:
+    """Renders redaction boxes from a base image into an output buffer.
+
+    Overlapping boxes are merged into disjoint groups and each group is
+    rendered in one pass over its bounding rectangle. When the box set
+    changes only the groups touching the changed boxes are re-rendered.
+    """
+
+    def __init__(
+        self,
+        base: ImageBuffer,
+        output: ImageBuffer,
+        style: str = redaction_style,
+        fill: str = "black",
+    ):
+        if style not in REDACTION_STYLES:
+            raise ValueError(
+                f"Unknown redaction style '{style}', expected one of {REDACTION_STYLES}"
+            )
+        self.base = base
+        self.output = output
+        self.style = style
+        self.fill = fill
+        self.boxes: set = set()
+        # Disjoint groups of overlapping boxes: bounding rects and member rects
+        self._group_rects = np.zeros((0, 4), dtype=np.int64)
+        self._group_members: List[np.ndarray] = []
+
+    def set_boxes(self, coordinates: Iterable[Box]) -> List[Rect]:
+        """Make the output show exactly these boxes, returns the re-rendered rects."""
+        boxes = set(self._clip(box) for box in coordinates)
+        boxes.discard(None)
+        added, removed = boxes - self.boxes, self.boxes - boxes
+        if not added and not removed:
+            return []
+        self.boxes = boxes
+
+        if len(added) + len(removed) > FULL_RENDER_CHANGES:
+            self._set_groups(merge_boxes(_to_rects(boxes)), _to_rects(boxes))
+            self.render()
+            return [(0, 0, self.base.width, self.base.height)]
+
+        # Only groups touching a changed box are regrouped; if a regrouped box
+        # grows into a neighbouring group, that group is pulled in as well
+        dirty = _to_rects(added | removed)
+        affected = _touching(self._group_rects, dirty)
+        removed_rects = _to_rects(removed)
+        while True:
+            pool = [m for m, hit in zip(self._group_members, affected) if hit]
+            pool = np.concatenate(pool + [_to_rects(added)])
+            pool = pool[~_contains_rows(pool, removed_rects)]
+            regrouped = merge_boxes(pool)
+            new_rects = np.array([rect for rect, _ in regrouped], dtype=np.int64).reshape(-1, 4)
+            grown = _touching(self._group_rects, new_rects) & ~affected
+            if not grown.any():
+                break
+            affected |= grown
+
+        # Everything the affected groups or changed boxes covered goes back to
+        # the base, then the regrouped boxes are drawn again
+        stale = np.concatenate([dirty, self._group_rects[affected]])
+        for rect in stale.tolist():
+            self._restore(rect)
+
+        kept = np.flatnonzero(~affected)
+        self._group_rects = np.concatenate([self._group_rects[kept], new_rects])
+        self._group_members = [self._group_members[i] for i in kept] + [
+            pool[members] for _, members in regrouped
+        ]
+        for rect, members in zip(new_rects.tolist(), self._group_members[len(kept):]):
+            self._render_group(rect, members)
+        return [tuple(rect) for rect in stale.tolist()]
+
+    def add(self, coordinates: Iterable[Box]) -> List[Rect]:
+        return self.set_boxes(self.boxes | set(map(tuple, coordinates)))
+
+    def render(self):
+        """Re-render the whole output from scratch."""
+        self.output.rgbx[...] = self.base.rgbx
+        for rect, members in zip(self._group_rects.tolist(), self._group_members):
+            self._render_group(rect, members)
+
+    def _set_groups(self, groups, rects: np.ndarray):
+        self._group_rects = np.array([rect for rect, _ in groups], dtype=np.int64).reshape(-1, 4)
+        self._group_members = [rects[members] for _, members in groups]
+
+    def _clip(self, box):
+        x, y, w, h = (int(v) for v in box)
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, self.base.width), min(y + h, self.base.height)
+        if x1 <= x0 or y1 <= y0:
+            return None
+        return (x0, y0, x1 - x0, y1 - y0)
+
+    def _restore(self, rect: Rect):
+        x0, y0, x1, y1 = rect
+        self.output.rgbx[y0:y1, x0:x1] = self.base.rgbx[y0:y1, x0:x1]
+
+    def _render_group(self, rect: Rect, members: np.ndarray):
+        x0, y0, x1, y1 = rect
+        out = self.output.rgbx[y0:y1, x0:x1, :3]
+        # A lone box covers its whole group rectangle, no mask needed
+        mask = box_mask(members, rect) if len(members) > 1 else slice(None)
+        if self.style == "fill":
+            out[mask] = ImageColor.getrgb(self.fill)[:3]
+        else:
+            # Kernels only see the group's own rectangle of the base image
+            source = np.ascontiguousarray(self.base.rgbx[y0:y1, x0:x1, :3])
+            out[mask] = self._filter(source)[mask]
+
+    def _filter(self, source: np.ndarray) -> np.ndarray:
+        height, width = source.shape[:2]
+        if self.style == "blur":
+            size = redaction_blur_kernel | 1  # Gaussian kernels must be odd
+            return cv2.GaussianBlur(source, (size, size), 0)
+        small = cv2.resize(
+            source,
+            (max(width // redaction_pixel_size, 1), max(height // redaction_pixel_size, 1)),
+            interpolation=cv2.INTER_AREA,
+        )
+        return cv2.resize(small, (width, height), interpolation=cv2.INTER_NEAREST)
+
+
+def _to_rects(boxes, corners: bool = False) -> np.ndarray:
+    """N x 4 array of (x0, y0, x1, y1) from (x, y, w, h) boxes or corner rects."""
+    rects = np.array(list(boxes), dtype=np.int64).reshape(-1, 4)
+    if not corners:
+        rects[:, 2:] += rects[:, :2]
+    return rects
+
+
+def _contains_rows(rows: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """For each row, whether it equals one of `targets`."""
+    if len(rows) == 0 or len(targets) == 0:
+        return np.zeros(len(rows), dtype=bool)
+    return (rows[:, None, :] == targets[None, :, :]).all(axis=2).any(axis=1)
+
+
+def _touching(rects: np.ndarray, others: np.ndarray) -> np.ndarray:
+    """For each rect, whether it overlaps any of `others`."""
+    if len(rects) == 0 or len(others) == 0:
+        return np.zeros(len(rects), dtype=bool)
+    a, b = rects[:, None, :], others[None, :, :]
+    overlap = (a[..., 0] < b[..., 2]) & (b[..., 0] < a[..., 2])
+    overlap &= (a[..., 1] < b[..., 3]) & (b[..., 1] < a[..., 3])
+    return overlap.any(axis=1)
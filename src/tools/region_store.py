@@ -0,0 +1,129 @@
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+Box = Tuple[int, int, int, int]  # (x, y, width, height)
+
+
+class RegionStore:
+    """Redaction boxes indexed by a uniform grid.
+
+    Every box is registered in the grid cells it overlaps, so point hit-tests
+    and rectangle queries only look at boxes near the query instead of
+    scanning the whole list. Boxes are unique and iterate in insertion order,
+    take a copy (e.g. `list(store)`) to change the store while iterating.
+    """
+
+    def __init__(self, boxes: Iterable[Box] = (), cell_size: int = 64):
+        self.cell_size = cell_size
+        self._boxes: Dict[Box, int] = {}  # Box -> insertion number
+        self._added = 0
+        self._grid: Dict[Tuple[int, int], Set[Box]] = {}
+        self.update(boxes)
+
+    def __len__(self):
+        return len(self._boxes)
+
+    def __iter__(self) -> Iterator[Box]:
+        return iter(self._boxes)
+
+    def __contains__(self, box) -> bool:
+        return _as_box(box) in self._boxes
+
+    def _cells(self, box: Box):
+        x, y, w, h = box
+        size = self.cell_size
+        # Zero-sized boxes still occupy the cell their corner is in
+        for cx in range(x // size, (x + max(w, 1) - 1) // size + 1):
+            for cy in range(y // size, (y + max(h, 1) - 1) // size + 1):
+                yield cx, cy
+
+    def add(self, box, merge: bool = False) -> Box:
+        """Add a box, ignoring exact duplicates.
+
+        With `merge`, every box overlapping the new one is replaced by their
+        common bounding box. Returns the box that ends up in the store.
+        """
+        box = _as_box(box)
+        if merge:
+            overlapping = self.query(box)
+            while overlapping:
+                for other in overlapping:
+                    self.remove(other)
+                    box = _union(box, other)
+                overlapping = self.query(box)
+        if box not in self._boxes:
+            self._boxes[box] = self._added
+            self._added += 1
+            for cell in self._cells(box):
+                self._grid.setdefault(cell, set()).add(box)
+        return box
+
+    def update(self, boxes: Iterable[Box], merge: bool = False):
+        for box in boxes:
+            self.add(box, merge)
+
+    def remove(self, box) -> bool:
+        box = _as_box(box)
+        if box not in self._boxes:
+            return False
+        del self._boxes[box]
+        for cell in self._cells(box):
+            bucket = self._grid.get(cell)
+            if bucket is not None:
+                bucket.discard(box)
+                if not bucket:
+                    del self._grid[cell]
+        return True
+
+    def hit_test(self, x: int, y: int) -> List[Box]:
+        """Boxes containing the point (x, y)."""
+        cell = (x // self.cell_size, y // self.cell_size)
+        return [
+            box
+            for box in self._grid.get(cell, ())
+            if box[0] <= x < box[0] + box[2] and box[1] <= y < box[1] + box[3]
+        ]
+
+    def remove_at(self, x: int, y: int) -> List[Box]:
+        """Remove and return every box containing the point (x, y)."""
+        hits = self.hit_test(x, y)
+        for box in hits:
+            self.remove(box)
+        return hits
+
+    def query(self, box) -> List[Box]:
+        """Boxes overlapping the rectangle (x, y, width, height)."""
+        x, y, w, h = _as_box(box)
+        found = set()
+        for cell in self._cells((x, y, w, h)):
+            for other in self._grid.get(cell, ()):
+                if (
+                    other[0] < x + w
+                    and x < other[0] + other[2]
+                    and other[1] < y + h
+                    and y < other[1] + other[3]
+                ):
+                    found.add(other)
+        # Insertion order, without looking at boxes outside the query
+        return sorted(found, key=self._boxes.__getitem__)
+
+    def merge_overlapping(self):
+        """Replace every cluster of overlapping boxes by its bounding box."""
+        boxes = list(self._boxes)
+        self.clear()
+        self.update(boxes, merge=True)
+
+    def clear(self):
+        self._boxes.clear()
+        self._grid.clear()
+
+
+def _as_box(box) -> Box:
+    x, y, w, h = box
+    return int(x), int(y), int(w), int(h)
+
+
+def _union(a: Box, b: Box) -> Box:
+    x0, y0 = min(a[0], b[0]), min(a[1], b[1])
+    x1 = max(a[0] + a[2], b[0] + b[2])
+    y1 = max(a[1] + a[3], b[1] + b[3])
+    return x0, y0, x1 - x0, y1 - y0
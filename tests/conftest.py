@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modules import each other relative to src (e.g. `from setting import ...`)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
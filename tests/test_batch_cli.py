@@ -0,0 +1,26 @@
+import os
+
+from batch_cli import collect_inputs, output_paths
+
+
+def test_inputs_sharing_a_stem_get_separate_outputs(tmp_path):
+    source = tmp_path / "in"
+    (source / "sub").mkdir(parents=True)
+    for name in ("scan.png", "scan.pdf", "sub/scan.tif"):
+        (source / name).write_bytes(b"")
+    root, paths = collect_inputs(str(source))
+    output = str(tmp_path / "out")
+
+    outputs = [output_paths(path, root, output) for path in paths]
+    assert sorted(os.path.relpath(sidecar, output) for _, sidecar in outputs) == [
+        "scan.pdf.json",
+        "scan.png.json",
+        os.path.join("sub", "scan.tif.json"),
+    ]
+    assert len({image for image, _ in outputs}) == 3
+
+    # A finished scan.png must not mark scan.pdf as done on resume
+    png_sidecar = output_paths(str(source / "scan.png"), root, output)[1]
+    os.makedirs(os.path.dirname(png_sidecar), exist_ok=True)
+    open(png_sidecar, "w").close()
+    assert not os.path.exists(output_paths(str(source / "scan.pdf"), root, output)[1])
@@ -0,0 +1,85 @@
+import random
+
+import pytest
+
+from ai_sensitive.layout import WordTable
+from ai_sensitive.schema import Line, Paragraph, Word
+
+
+def loop_grouping(data, line_threshold, paragraph_threshold):
+    """The per-word grouping OCRDocument used before WordTable.group."""
+    lines = []
+    current_line = Line()
+    previous_y = None
+    for i in range(len(data["text"])):
+        text = data["text"][i].strip()
+        if text:
+            x, y, w, h = data["left"][i], data["top"][i], data["width"][i], data["height"][i]
+            if previous_y is not None and abs(y - previous_y) > line_threshold:
+                lines.append(current_line)
+                current_line = Line()
+            current_line.add_word(Word(text, x, y, w, h))
+            previous_y = y
+    if current_line.words:
+        lines.append(current_line)
+
+    paragraphs = []
+    current_paragraph = Paragraph()
+    previous_y = None
+    for line in lines:
+        avg_y = sum(word.y for word in line.words) / len(line.words)
+        if previous_y is not None and abs(avg_y - previous_y) > paragraph_threshold:
+            paragraphs.append(current_paragraph)
+            current_paragraph = Paragraph()
+        current_paragraph.add_line(line)
+        previous_y = avg_y
+    if current_paragraph.lines:
+        paragraphs.append(current_paragraph)
+    return paragraphs
+
+
+def synthetic_table(seed):
+    """Tesseract-style word table: jittered lines, paragraph gaps, empty entries."""
+    rng = random.Random(seed)
+    data = {key: [] for key in ("text", "left", "top", "width", "height")}
+    y = 10
+    for _ in range(rng.randint(3, 6)):  # Paragraphs
+        for _ in range(rng.randint(1, 4)):  # Lines
+            x = 10
+            for _ in range(rng.randint(1, 6)):  # Words
+                text = rng.choice(["Alice", "Smith", "42", "Main", "St.", "", " "])
+                width = rng.randint(10, 60)
+                data["text"].append(text)
+                data["left"].append(x)
+                data["top"].append(y + rng.randint(-3, 3))
+                data["width"].append(width)
+                data["height"].append(rng.randint(10, 14))
+                x += width + rng.randint(4, 12)
+            y += rng.randint(16, 24)
+        y += rng.randint(20, 40)
+    return data
+
+
+def structure(paragraphs):
+    return [
+        [[(w.text, w.x, w.y, w.width, w.height) for w in line.words] for line in paragraph.lines]
+        for paragraph in paragraphs
+    ]
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("line_threshold, paragraph_threshold", [(5, 25), (6, 20), (10, 30), (0, 0)])
+def test_group_matches_loop(seed, line_threshold, paragraph_threshold):
+    data = synthetic_table(seed)
+    table = WordTable.from_tesseract(data)
+    table.group(line_threshold, paragraph_threshold)
+
+    expected = loop_grouping(data, line_threshold, paragraph_threshold)
+    assert structure(table.paragraphs()) == structure(expected)
+    assert [p.get_text() for p in table.paragraphs()] == [p.get_text() for p in expected]
+
+
+def test_group_empty_table():
+    table = WordTable.from_tesseract({key: [" "] for key in ("text", "left", "top", "width", "height")})
+    table.group(5, 20)
+    assert table.paragraphs() == []
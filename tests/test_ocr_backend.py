@@ -0,0 +1,85 @@
+import sys
+import threading
+import types
+
+import numpy as np
+
+from ai_sensitive.ocr_backend import TesserocrBackend
+
+
+class FakeAPI:
+    created = 0
+
+    def __init__(self, lang, psm, oem):
+        FakeAPI.created += 1
+        self.busy = threading.Event()
+        self.release = None
+
+    def SetVariable(self, name, value):
+        pass
+
+    def SetImage(self, image):
+        if self.release is not None:
+            self.busy.set()
+            self.release.wait(5)
+
+    def Recognize(self):
+        pass
+
+    def GetIterator(self):
+        return None
+
+    def Clear(self):
+        pass
+
+
+def fake_tesserocr():
+    return types.SimpleNamespace(
+        PyTessBaseAPI=FakeAPI,
+        PSM=types.SimpleNamespace(AUTO=3),
+        OEM=types.SimpleNamespace(DEFAULT=3),
+        RIL=types.SimpleNamespace(WORD=3),
+        iterate_level=lambda iterator, level: [],
+    )
+
+
+def run_in_thread(backend, image, config=""):
+    thread = threading.Thread(target=backend.image_to_data, args=(image, "eng", config))
+    thread.start()
+    thread.join()
+
+
+def test_engines_outlive_threads(monkeypatch):
+    monkeypatch.setitem(sys.modules, "tesserocr", fake_tesserocr())
+    FakeAPI.created = 0
+    backend = TesserocrBackend()
+    image = np.zeros((10, 10), np.uint8)
+
+    # Like GUI detection jobs: a new short-lived thread per call
+    for _ in range(3):
+        run_in_thread(backend, image)
+    assert FakeAPI.created == 1
+
+    run_in_thread(backend, image, "--psm 6")
+    assert FakeAPI.created == 2
+
+
+def test_concurrent_calls_get_separate_engines(monkeypatch):
+    monkeypatch.setitem(sys.modules, "tesserocr", fake_tesserocr())
+    FakeAPI.created = 0
+    backend = TesserocrBackend()
+    image = np.zeros((10, 10), np.uint8)
+    run_in_thread(backend, image)
+
+    # Hold the only idle engine inside a call, a second caller must not share it
+    (engine,) = backend._idle[("eng", "")]
+    engine.release = threading.Event()
+    first = threading.Thread(target=backend.image_to_data, args=(image, "eng", ""))
+    first.start()
+    assert engine.busy.wait(5)
+    run_in_thread(backend, image)
+    engine.release.set()
+    first.join()
+
+    assert FakeAPI.created == 2
+    assert len(backend._idle[("eng", "")]) == 2
@@ -0,0 +1,58 @@
+import random
+
+import numpy as np
+import pytest
+
+from tools.image_buffer import ImageBuffer
+from tools.redaction_compositor import (
+    REDACTION_STYLES,
+    RedactionCompositor,
+    _to_rects,
+    merge_boxes,
+)
+
+WIDTH, HEIGHT = 120, 90
+
+
+def random_box(rng):
+    # Some boxes stick out of the image to exercise clipping
+    x, y = rng.randint(-10, WIDTH - 5), rng.randint(-10, HEIGHT - 5)
+    return (x, y, rng.randint(3, 40), rng.randint(3, 30))
+
+
+def full_render(base, style, boxes):
+    reference = RedactionCompositor(base, base.copy(), style=style)
+    rects = _to_rects(boxes)
+    reference._set_groups(merge_boxes(rects), rects)
+    reference.render()
+    return reference.output.rgbx
+
+
+@pytest.mark.parametrize("style", REDACTION_STYLES)
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_matches_full_render(style, seed):
+    rng = random.Random(seed)
+    pixels = np.random.default_rng(seed).integers(0, 256, (HEIGHT, WIDTH, 4), dtype=np.uint8)
+    base = ImageBuffer(pixels)
+    compositor = RedactionCompositor(base, base.copy(), style=style)
+
+    boxes = set()
+    for _ in range(30):
+        # Add a few boxes and drop a few of the current ones
+        for _ in range(rng.randint(0, 4)):
+            boxes.add(random_box(rng))
+        for box in rng.sample(sorted(boxes), min(len(boxes), rng.randint(0, 3))):
+            boxes.discard(box)
+        compositor.set_boxes(boxes)
+
+        expected = full_render(base, style, compositor.boxes)
+        assert np.array_equal(compositor.output.rgbx, expected)
+
+
+def test_removing_every_box_restores_the_base():
+    pixels = np.random.default_rng(0).integers(0, 256, (HEIGHT, WIDTH, 4), dtype=np.uint8)
+    base = ImageBuffer(pixels)
+    compositor = RedactionCompositor(base, base.copy(), style="blur")
+    compositor.set_boxes([(5, 5, 30, 20), (20, 15, 30, 20), (80, 60, 20, 20)])
+    compositor.set_boxes([])
+    assert np.array_equal(compositor.output.rgbx, base.rgbx)
@@ -0,0 +1,90 @@
+import pytest
+from PIL import Image
+
+import setting
+from ai_sensitive import sensitive_ai_detector
+from ai_sensitive.schema import Line, Paragraph, Word
+from tools.basic_info import BasicInfo
+
+WORDS = [("Jane", 10), ("Doe", 60), ("lives", 110), ("in", 170), ("Paris", 200)]
+
+
+class FakeModel:
+    """Scores "Jane Doe" as a Name and "Doe lives in Paris" as an Address."""
+
+    def __init__(self):
+        self.calls = []
+
+    def batch_predict_entities(self, texts, labels, flat_ner=True, threshold=0.5, multi_label=False):
+        self.calls.append(list(labels))
+        results = []
+        for text in texts:
+            entities = []
+            if "Name" in labels:
+                entities.append({"text": "Jane Doe", "label": "Name", "start": 0, "end": 8, "score": 0.9})
+            if "Address" in labels:
+                start = text.index("Doe")
+                entities.append(
+                    {"text": text[start:], "label": "Address", "start": start, "end": len(text), "score": 0.4}
+                )
+            results.append([e for e in entities if e["score"] >= threshold])
+        return results
+
+
+class FakeOCR:
+    def __init__(self):
+        line = Line()
+        for text, x in WORDS:
+            line.add_word(Word(text, x, 10, 40, 20))
+        paragraph = Paragraph()
+        paragraph.add_line(line)
+        self.paragraphs = [paragraph]
+
+
+@pytest.fixture
+def basic_info(monkeypatch):
+    monkeypatch.setattr(setting, "cache_enabled", False)
+    model = FakeModel()
+    monkeypatch.setattr(sensitive_ai_detector, "load_model", lambda: model)
+    info = BasicInfo("test", image=Image.new("RGB", (300, 50), "white"))
+    info.ocr = FakeOCR()
+    info.sensitive_ai_detector = sensitive_ai_detector.SensitiveAIDetector(info.ocr)
+    info.model = model
+    return info
+
+
+def boxes_of(words):
+    return {(x, 10, 40, 20) for text, x in WORDS if text in words}
+
+
+def test_threshold_and_labels_reuse_stored_scores(basic_info):
+    basic_info.redetect(labels=["Name"])
+    assert set(basic_info.sensitive_coordinates) == boxes_of({"Jane", "Doe"})
+
+    basic_info.redetect(labels=["Name", "Address"])
+    # "Doe" belongs to the higher scoring name, the address keeps the rest
+    assert [e["label"] for e in basic_info.sensitive_info] == ["Name"]
+    basic_info.redetect(labels=["Address"])
+    assert set(basic_info.sensitive_coordinates) == boxes_of({"Doe", "lives", "in", "Paris"})
+
+    basic_info.redetect(labels=["Address"], threshold=0.5)
+    assert basic_info.sensitive_coordinates == []
+    # Only the first request for each label ran the model
+    assert basic_info.model.calls == [["Name"], ["Address"]]
+
+
+def test_manual_edits_survive_redetection(basic_info):
+    basic_info.redetect(labels=["Name"])
+    # Merged with the detected "Jane" box, the merge must not outlive it
+    basic_info.add_sensitive_coordinates((5, 5, 20, 20), merge=True)
+    basic_info.add_sensitive_coordinates((250, 30, 10, 10))
+    basic_info.remove_sensitive_coordinates((70, 20))  # "Doe"
+
+    basic_info.redetect(labels=["Address"])
+    assert set(basic_info.sensitive_coordinates) == (
+        boxes_of({"lives", "in", "Paris"}) | {(5, 5, 20, 20), (250, 30, 10, 10)}
+    )
+
+    basic_info.remove_sensitive_coordinates((255, 35))
+    basic_info.redetect(labels=["Name"])
+    assert set(basic_info.sensitive_coordinates) == {(5, 5, 45, 25)}
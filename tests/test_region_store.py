@@ -0,0 +1,67 @@
+import pytest
+
+from tools.region_store import RegionStore
+
+
+@pytest.fixture
+def store():
+    # Small cells so boxes span several of them
+    return RegionStore([(0, 0, 10, 10), (100, 100, 30, 20), (5, 5, 10, 10)], cell_size=16)
+
+
+@pytest.mark.parametrize(
+    "point, expected",
+    [
+        ((0, 0), [(0, 0, 10, 10)]),
+        ((7, 7), [(0, 0, 10, 10), (5, 5, 10, 10)]),
+        ((10, 10), [(5, 5, 10, 10)]),  # Right/bottom edges are exclusive
+        ((15, 15), []),
+        ((129, 119), [(100, 100, 30, 20)]),
+        ((130, 100), []),
+        ((500, 500), []),
+    ],
+)
+def test_hit_test(store, point, expected):
+    assert sorted(store.hit_test(*point)) == expected
+
+
+@pytest.mark.parametrize(
+    "rect, expected",
+    [
+        ((0, 0, 200, 200), [(0, 0, 10, 10), (100, 100, 30, 20), (5, 5, 10, 10)]),
+        ((12, 12, 5, 5), [(5, 5, 10, 10)]),
+        ((10, 0, 5, 5), []),  # Touching edges do not overlap
+        ((90, 90, 11, 11), [(100, 100, 30, 20)]),
+        ((40, 40, 20, 20), []),
+    ],
+)
+def test_query_in_insertion_order(store, rect, expected):
+    assert store.query(rect) == expected
+
+
+def test_duplicates_are_ignored(store):
+    store.add((0, 0, 10, 10))
+    store.add([0.0, 0.0, 10.0, 10.0])
+    assert len(store) == 3
+    assert list(store) == [(0, 0, 10, 10), (100, 100, 30, 20), (5, 5, 10, 10)]
+
+
+def test_remove_at(store):
+    assert sorted(store.remove_at(7, 7)) == [(0, 0, 10, 10), (5, 5, 10, 10)]
+    assert list(store) == [(100, 100, 30, 20)]
+    assert store.hit_test(7, 7) == []
+    assert store.remove((0, 0, 10, 10)) is False
+
+
+def test_merge_add_chains_overlaps():
+    store = RegionStore([(0, 0, 10, 10), (20, 0, 10, 10), (100, 0, 10, 10)], cell_size=16)
+    # Bridges the first two, the union then still misses the third
+    assert store.add((5, 0, 20, 5), merge=True) == (0, 0, 30, 10)
+    assert list(store) == [(100, 0, 10, 10), (0, 0, 30, 10)]
+    assert store.query((0, 0, 200, 200)) == [(100, 0, 10, 10), (0, 0, 30, 10)]
+    assert store.hit_test(15, 5) == [(0, 0, 30, 10)]
+
+
+def test_merge_overlapping(store):
+    store.merge_overlapping()
+    assert sorted(store) == [(0, 0, 15, 15), (100, 100, 30, 20)]
@@ -0,0 +1,88 @@
+import pytest
+
+from ai_sensitive.rule_detector import RULE_COVERED_LABELS, detect_rule_entities, luhn_valid
+from ai_sensitive.sensitive_info_utils import ner_labels
+
+
+def found(text, labels=None):
+    return [(entity["text"], entity["label"]) for entity in detect_rule_entities(text, labels)]
+
+
+@pytest.mark.parametrize(
+    "digits, valid",
+    [
+        ("4111111111111111", True),
+        ("4111111111111112", False),
+        ("5500005555555559", True),
+        ("378282246310005", True),
+        ("378282246310006", False),
+        ("0", True),
+    ],
+)
+def test_luhn(digits, valid):
+    assert luhn_valid(digits) is valid
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        # Email
+        ("mail jane.doe+x@mail.example.co.uk now", [("jane.doe+x@mail.example.co.uk", "Email Address")]),
+        ("not an email: jane@localhost", []),
+        # IPv4 / IPv6
+        ("host 192.168.0.1 up", [("192.168.0.1", "IP Address")]),
+        ("host 999.1.1.1 up", []),
+        ("version 1.2.3.4.5", []),
+        ("addr 2001:db8::1 up", [("2001:db8::1", "IP Address")]),
+        ("addr fe80::1ff:fe23:4567:890a", [("fe80::1ff:fe23:4567:890a", "IP Address")]),
+        ("a :: b", []),
+        ("time 12:30:45", []),
+        # SSN
+        ("SSN 123-45-6789", [("123-45-6789", "Social Security Number")]),
+        ("SSN 123 45 6789", [("123 45 6789", "Social Security Number")]),
+        ("SSN 000-12-3456", []),
+        ("SSN 666-12-3456", []),
+        ("SSN 912-12-3456", []),
+        ("SSN 123-00-4567", []),
+        # Credit card
+        ("card 4111 1111 1111 1111", [("4111 1111 1111 1111", "Credit Card Number")]),
+        ("card 4111-1111-1111-1111", [("4111-1111-1111-1111", "Credit Card Number")]),
+        ("card 378282246310005", [("378282246310005", "Credit Card Number")]),
+        ("card 4111 1111 1111 1112", []),
+        # Phone
+        ("call +1 415-555-2671", [("+1 415-555-2671", "Phone Number")]),
+        ("call (415) 555 2671", [("(415) 555 2671", "Phone Number")]),
+        ("call 555-2671", []),
+        # Dates need a keyword
+        ("DOB: 12/31/1990", [("12/31/1990", "Date of Birth")]),
+        ("issued 1 May 2020", [("1 May 2020", "Issue Date")]),
+        ("meeting on 2020-05-01", []),
+        (
+            "DOB 1990-01-02, issued March 3, 2015",
+            [("1990-01-02", "Date of Birth"), ("March 3, 2015", "Issue Date")],
+        ),
+    ],
+)
+def test_detect_rule_entities(text, expected):
+    assert found(text) == expected
+
+
+def test_label_filter():
+    text = "jane@example.com 192.168.0.1"
+    assert found(text, ["IP Address"]) == [("192.168.0.1", "IP Address")]
+
+
+def test_entity_offsets():
+    text = "Contact: jane@example.com"
+    (entity,) = detect_rule_entities(text)
+    assert text[entity["start"] : entity["end"]] == entity["text"]
+    assert entity["score"] == 1.0
+
+
+@pytest.mark.parametrize(
+    "label", ["Social Security Number", "Credit Card Number", "Phone Number", "Date of Birth"]
+)
+def test_partly_covered_labels_stay_in_ner(label):
+    # Forms the rules miss (no separators, OCR misreads) must still reach NER
+    assert label not in RULE_COVERED_LABELS
+    assert label in ner_labels([label])
@@ -0,0 +1,50 @@
+import pytest
+
+from ai_sensitive.schema import Line, Paragraph, Word
+
+
+@pytest.fixture
+def paragraph():
+    # "Alice Smith lives\nin Paris" -> "Alice Smith lives in Paris"
+    paragraph = Paragraph()
+    for texts in (["Alice", "Smith", "lives"], ["in", "Paris"]):
+        line = Line()
+        for index, text in enumerate(texts):
+            line.add_word(Word(text, index * 10, 0, 8, 8))
+        paragraph.add_line(line)
+    return paragraph
+
+
+def texts(words):
+    return [word.text for word in words]
+
+
+def test_text_offsets(paragraph):
+    assert paragraph.get_text() == "Alice Smith lives in Paris"
+
+
+@pytest.mark.parametrize(
+    "span, expected",
+    [
+        ((0, 5), ["Alice"]),  # Exactly one word
+        ((1, 3), ["Alice"]),  # Inside one word
+        ((7, 8), ["Smith"]),
+        ((3, 8), ["Alice", "Smith"]),  # Across a word boundary
+        ((8, 23), ["Smith", "lives", "in", "Paris"]),  # Across a line break
+        ((0, 26), ["Alice", "Smith", "lives", "in", "Paris"]),
+        ((5, 11), ["Smith"]),  # Starts in the separator
+        ((6, 12), ["Smith"]),  # Ends in the separator
+        ((5, 12), ["Smith"]),  # Starts and ends in separators
+        ((5, 6), []),  # Only the separator
+        ((21, 26), ["Paris"]),  # Last word
+    ],
+)
+def test_words_in_span(paragraph, span, expected):
+    assert texts(paragraph.words_in_span(*span)) == expected
+
+
+def test_words_in_span_after_edit(paragraph):
+    line = Line()
+    line.add_word(Word("France", 0, 20, 8, 8))
+    paragraph.add_line(line)
+    assert texts(paragraph.words_in_span(27, 33)) == ["France"]
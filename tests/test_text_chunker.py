@@ -0,0 +1,47 @@
+import pytest
+
+from ai_sensitive.text_chunker import WORD_PATTERN, chunk_text, merge_chunk_entities
+
+
+def words(text):
+    return WORD_PATTERN.findall(text)
+
+
+def test_short_text_is_one_chunk():
+    assert chunk_text("Jane Doe, 1 Main St.", 10, 2) == [(0, 20)]
+
+
+def test_punctuation_counts_against_the_budget():
+    # 5 whitespace words but 13 GLiNER words
+    text = "a.b.c, d-e f_g (h) i!"
+    assert len(words(text)) == 13
+    chunks = chunk_text(text, 6, 2)
+    assert len(chunks) > 1
+    for start, end in chunks:
+        assert len(words(text[start:end])) <= 6
+
+
+def test_chunks_overlap_and_cover_the_text():
+    text = " ".join(f"w{i}" for i in range(50))
+    chunks = chunk_text(text, 20, 5)
+    assert chunks[0][0] == 0 and chunks[-1][1] == len(text)
+    for (_, end), (start, _) in zip(chunks, chunks[1:]):
+        assert len(words(text[start:end])) == 5
+
+
+def test_overlap_must_be_smaller_than_size():
+    with pytest.raises(ValueError):
+        chunk_text("a b c", 3, 3)
+
+
+def test_merge_prefers_unclipped_entities():
+    text = "aa Jane Doe bb"
+    chunks = [(0, 11), (1, 14)]
+    clipped = {"text": "Jane Doe", "label": "Name", "start": 3, "end": 11, "score": 0.9}
+    whole = {"text": "Jane Doe", "label": "Name", "start": 2, "end": 10, "score": 0.5}
+    other = {"text": "Doe", "label": "Address", "start": 7, "end": 10, "score": 0.2}
+    merged = merge_chunk_entities(text, chunks, [[clipped], [whole, other]])
+    assert [(e["text"], e["label"], e["score"]) for e in merged] == [
+        ("Jane Doe", "Name", 0.5),
+        ("Doe", "Address", 0.2),
+    ]
@@ -0,0 +1,50 @@
+import cv2
+import numpy as np
+
+from ai_sensitive.text_regions import detect_text_regions
+
+
+def page():
+    return np.full((1200, 900), 255, np.uint8)
+
+
+def test_finds_text_and_skips_photos():
+    image = page()
+    cv2.putText(image, "Name: Jane Doe", (50, 100), cv2.FONT_HERSHEY_SIMPLEX, 1.2, 0, 2)
+    cv2.putText(image, "Passport X1234567", (400, 1000), cv2.FONT_HERSHEY_SIMPLEX, 1.2, 0, 2)
+    noise = np.random.default_rng(0).integers(0, 255, (400, 300)).astype(np.uint8)
+    image[300:700, 100:400] = cv2.GaussianBlur(noise, (31, 31), 0)
+
+    regions = detect_text_regions(image)
+    assert len(regions) == 2
+    (x0, y0, x1, y1), (x2, y2, x3, y3) = regions
+    assert x0 <= 50 and y0 <= 75 and x1 >= 280 and y1 >= 100
+    assert x2 <= 400 and y2 <= 975 and x3 >= 700 and y3 >= 1000
+
+
+def test_blank_page_falls_back_to_full_page():
+    assert detect_text_regions(page()) is None
+
+
+def test_dense_page_falls_back_to_full_page():
+    image = page()
+    for row in range(35):
+        cv2.putText(image, "Lorem ipsum dolor sit amet, consectetur", (10, 30 + row * 33),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.0, 0, 2)
+    assert detect_text_regions(image) is None
+
+
+def test_padding_scales_with_large_pages():
+    # Above the analysis size, lines are measured on a downscaled copy
+    image = np.full((6000, 4500), 255, np.uint8)
+    # Capitals and digits only, so the ink height is the line height
+    cv2.putText(image, "NAME JANE DOE", (300, 600), cv2.FONT_HERSHEY_SIMPLEX, 4.0, 0, 8)
+    cv2.putText(image, "ID X1234567", (1500, 4500), cv2.FONT_HERSHEY_SIMPLEX, 4.0, 0, 8)
+
+    regions = detect_text_regions(image)
+    assert len(regions) == 2
+    for x0, y0, x1, y1 in regions:
+        ys, xs = np.nonzero(image[y0:y1, x0:x1] < 128)
+        line_height = ys.max() - ys.min() + 1
+        margins = (xs.min(), ys.min(), x1 - x0 - 1 - xs.max(), y1 - y0 - 1 - ys.max())
+        assert min(margins) >= line_height // 2 - 2